@@ -4,47 +4,76 @@ Loads GTO charts from JSON files and provides lookup functions.
 """
 
 import json
+from bisect import bisect_left
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Collection, Mapping, Optional
 from functools import lru_cache
 
+from app.poker.hand_encoding import normalize_hand
+
 
 # Path to chart data
 CHARTS_DIR = Path(__file__).parent.parent.parent / "data" / "gto_charts"
 
+# Range that contains every hand
+ANY_HAND = frozenset({"any"})
+
 
 @lru_cache(maxsize=4)
 def load_chart(chart_name: str) -> dict:
-    """Load a chart from JSON file with caching."""
+    """Load a chart from JSON file with caching.
+    
+    Hand lists under "ranges"/"call_ranges" are frozen into frozensets
+    so range membership checks are hash lookups.
+    """
     chart_path = CHARTS_DIR / f"{chart_name}.json"
     if not chart_path.exists():
         return {}
     
     with open(chart_path, "r") as f:
-        return json.load(f)
+        chart = json.load(f)
+    
+    for key in ("ranges", "call_ranges"):
+        if key in chart:
+            chart[key] = _freeze_ranges(chart[key])
+    
+    return chart
+
 
+def _freeze_ranges(data):
+    """Recursively convert hand lists to frozensets."""
+    if isinstance(data, dict):
+        return {k: _freeze_ranges(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return frozenset(data)
+    return data
 
+
+@lru_cache(maxsize=256)
 def get_push_fold_range(
     position: str,
     stack_bb: int,
     table_format: str = "9max"
-) -> list[str]:
+) -> frozenset[str]:
     """
     Get push range for given position and stack.
     
+    Cached per (position, stack_bb, table_format).
+    
     Args:
         position: Player position (UTG, HJ, CO, BTN, SB, etc.)
         stack_bb: Stack in big blinds (will be rounded to nearest bucket)
         table_format: "6max" or "9max"
     
     Returns:
-        List of hands in the push range
+        Set of hands in the push range
     """
     chart_file = f"push_fold_{table_format}"
     chart = load_chart(chart_file)
     
     if not chart:
-        return []
+        return frozenset()
     
     ranges = chart.get("ranges", {})
     position_ranges = ranges.get(position, {})
@@ -53,26 +82,29 @@ def get_push_fold_range(
     stack_key = _get_stack_key(stack_bb, position_ranges)
     
     if not stack_key:
-        return []
+        return frozenset()
     
-    range_data = position_ranges.get(stack_key, [])
+    range_data = position_ranges.get(stack_key, frozenset())
     
     # Handle "any" case (push any hand)
     if range_data == "any":
-        return ["any"]
+        return ANY_HAND
     
     return range_data
 
 
+@lru_cache(maxsize=256)
 def get_call_range(
     position: str,
     stack_bb: int,
     table_format: str = "9max",
     vs_position: str = "SB"
-) -> list[str]:
+) -> frozenset[str]:
     """
     Get calling range vs all-in.
     
+    Cached per (position, stack_bb, table_format, vs_position).
+    
     Args:
         position: Hero's position (typically BB)
         stack_bb: Effective stack
@@ -80,13 +112,13 @@ def get_call_range(
         vs_position: Villain's position
     
     Returns:
-        List of hands in the call range
+        Set of hands in the call range
     """
     chart_file = f"push_fold_{table_format}"
     chart = load_chart(chart_file)
     
     if not chart:
-        return []
+        return frozenset()
     
     call_ranges = chart.get("call_ranges", {})
     range_key = f"{position}_vs_{vs_position}"
@@ -95,70 +127,78 @@ def get_call_range(
     stack_key = _get_stack_key(stack_bb, position_ranges)
     
     if not stack_key:
-        return []
+        return frozenset()
     
-    return position_ranges.get(stack_key, [])
+    return position_ranges.get(stack_key, frozenset())
 
 
+@lru_cache(maxsize=32)
 def get_opening_range(
     position: str,
     table_format: str = "9max"
-) -> dict:
+) -> Mapping:
     """
     Get opening range for position.
     
+    Cached per (position, table_format) as a read-only mapping.
+    
     Returns:
-        Dict with 'raise' list and 'raise_size'
+        Mapping with 'raise' set and 'raise_size'
     """
     chart = load_chart("opening_ranges")
     
     if not chart:
-        return {"raise": [], "raise_size": 2.5}
+        return MappingProxyType({"raise": frozenset(), "raise_size": 2.5})
     
     ranges = chart.get("ranges", {})
     format_ranges = ranges.get(table_format, ranges.get("9max", {}))
     position_data = format_ranges.get(position, {})
     
-    return {
-        "raise": position_data.get("raise", []),
+    return MappingProxyType({
+        "raise": position_data.get("raise", frozenset()),
         "raise_size": position_data.get("raise_size", 2.5),
         "description": position_data.get("description", "")
-    }
+    })
 
 
+@lru_cache(maxsize=32)
 def get_3bet_range(
     vs_position: str
-) -> dict:
+) -> Mapping:
     """
     Get 3-bet range vs given position.
     
+    Cached per position as a read-only mapping.
+    
     Returns:
-        Dict with 'value', 'bluff', and 'call' lists
+        Mapping with 'value', 'bluff', and 'call' sets
     """
     chart = load_chart("3bet_ranges")
     
     if not chart:
-        return {"3bet_value": [], "3bet_bluff": [], "call": []}
+        return MappingProxyType(
+            {"3bet_value": frozenset(), "3bet_bluff": frozenset(), "call": frozenset()}
+        )
     
     ranges = chart.get("ranges", {})
     range_key = f"vs_{vs_position}"
     position_data = ranges.get(range_key, {})
     
-    return {
-        "3bet_value": position_data.get("3bet_value", []),
-        "3bet_bluff": position_data.get("3bet_bluff", []),
-        "call": position_data.get("call", []),
+    return MappingProxyType({
+        "3bet_value": position_data.get("3bet_value", frozenset()),
+        "3bet_bluff": position_data.get("3bet_bluff", frozenset()),
+        "call": position_data.get("call", frozenset()),
         "description": position_data.get("description", "")
-    }
+    })
 
 
-def is_hand_in_range(hand: str, range_list: list[str]) -> bool:
+def is_hand_in_range(hand: str, range_list: Collection[str]) -> bool:
     """
     Check if a hand is in the given range.
     
     Args:
         hand: Hand notation (e.g., "AKs", "QQ", "T9o")
-        range_list: List of hands in the range
+        range_list: Hands in the range (frozenset from charts, or list)
     
     Returns:
         True if hand is in range
@@ -170,44 +210,32 @@ def is_hand_in_range(hand: str, range_list: list[str]) -> bool:
         return True
     
     # Normalize hand notation
-    normalized = _normalize_hand(hand)
+    normalized = normalize_hand(hand)
     
     return normalized in range_list
 
 
-def _normalize_hand(hand: str) -> str:
-    """Normalize hand notation (e.g., 'KAs' -> 'AKs')."""
-    if len(hand) < 2:
-        return hand
-    
-    ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-    rank_order = {r: i for i, r in enumerate(ranks)}
-    
-    r1, r2 = hand[0].upper(), hand[1].upper()
-    suffix = hand[2:].lower() if len(hand) > 2 else ""
-    
-    # Sort ranks (higher first)
-    if rank_order.get(r1, 0) < rank_order.get(r2, 0):
-        r1, r2 = r2, r1
+def _get_stack_key(stack_bb: int, ranges: dict) -> Optional[str]:
+    """Find the nearest stack bucket key."""
+    stacks, keys = _stack_buckets(tuple(ranges))
     
-    # Pairs don't have suffix
-    if r1 == r2:
-        return f"{r1}{r2}"
+    if not stacks:
+        return None
     
-    return f"{r1}{r2}{suffix}"
+    # Nearest bucket at or above the stack, largest if stack exceeds all
+    i = bisect_left(stacks, stack_bb)
+    return keys[min(i, len(keys) - 1)]
 
 
-def _get_stack_key(stack_bb: int, ranges: dict) -> Optional[str]:
-    """Find the nearest stack bucket key."""
-    # Standard buckets
-    buckets = [3, 4, 5, 6, 7, 8, 10, 12, 15]
-    
+@lru_cache(maxsize=64)
+def _stack_buckets(range_keys: tuple[str, ...]) -> tuple[list[int], list[str]]:
+    """Parse stack bucket keys into sorted (stacks, keys) lists."""
     # Find nearest bucket that exists in ranges
-    available_keys = [k for k in ranges.keys() if k.endswith("bb")]
+    available_keys = [k for k in range_keys if k.endswith("bb")]
     
     if not available_keys:
         # Try without 'bb' suffix
-        available_keys = list(ranges.keys())
+        available_keys = list(range_keys)
     
     # Parse available stack sizes
     available_stacks = []
@@ -218,18 +246,9 @@ def _get_stack_key(stack_bb: int, ranges: dict) -> Optional[str]:
         except ValueError:
             continue
     
-    if not available_stacks:
-        return None
-    
-    # Find nearest bucket
     available_stacks.sort(key=lambda x: x[0])
     
-    for stack, key in available_stacks:
-        if stack_bb <= stack:
-            return key
-    
-    # Return largest if stack exceeds all buckets
-    return available_stacks[-1][1]
+    return [s for s, _ in available_stacks], [k for _, k in available_stacks]
 
 
 def get_chart_stats() -> dict:
@@ -254,3 +273,8 @@ def get_chart_stats() -> dict:
 def clear_chart_cache():
     """Clear the chart loading cache."""
     load_chart.cache_clear()
+    get_push_fold_range.cache_clear()
+    get_call_range.cache_clear()
+    _stack_buckets.cache_clear()
+    get_opening_range.cache_clear()
+    get_3bet_range.cache_clear()
@@ -17,6 +17,8 @@ from typing import Optional
 from itertools import combinations
 import time
 
+from app.poker.hand_encoding import cards_to_hand
+
 
 # Card representation
 RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
@@ -302,20 +304,8 @@ class EquityCalculator:
         if len(cards) != 2:
             return "".join(sorted(cards))
         
-        r1, r2 = cards[0][0], cards[1][0]
-        s1, s2 = cards[0][1], cards[1][1]
-        
-        # Sort by rank
-        if RANK_VALUES[r1] < RANK_VALUES[r2]:
-            r1, r2 = r2, r1
-            s1, s2 = s2, s1
-        
-        if r1 == r2:
-            return f"{r1}{r2}"  # Pair
-        elif s1 == s2:
-            return f"{r1}{r2}s"  # Suited
-        else:
-            return f"{r1}{r2}o"  # Offsuit
+        (r1, s1), (r2, s2) = cards[0][:2], cards[1][:2]
+        return cards_to_hand(r1, s1, r2, s2)
     
     def equity_vs_range(
         self,
@@ -1,7 +1,15 @@
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 from enum import Enum
 
+from app.poker.hand_encoding import cards_to_hand
+
+
+# Hand notation keyed by the hole cards' (rank, suit) values; there are only
+# 1326 two-card combos
+_cached_hand = lru_cache(maxsize=2048)(cards_to_hand)
+
 
 class Street(Enum):
     PREFLOP = "preflop"
@@ -129,7 +137,10 @@ class GameState:
     @property
     def num_active_players(self) -> int:
         """Number of players still in the hand."""
-        return sum(1 for p in self.players if p.is_active)
+        count = 0
+        for p in self.players:
+            count += p.is_active
+        return count
     
     @property
     def pot_bb(self) -> float:
@@ -142,31 +153,23 @@ class GameState:
     def is_preflop(self) -> bool:
         return self.street == "preflop"
     
+    @property
+    def is_valid_hero(self) -> bool:
+        """Whether hero is seated and has hole cards (cheap checks first)."""
+        return bool(self.hero_cards) and self.hero is not None
+    
     @property
     def hero_hand(self) -> Optional[str]:
-        """Get hero's hand in notation (e.g., 'AKs', 'QQ')."""
+        """Get hero's hand in notation (e.g., 'AKs', 'QQ').
+        
+        Cached on the current cards' values, so in-place changes to
+        ``hero_cards`` are picked up.
+        """
         if len(self.hero_cards) != 2:
             return None
         
         card1, card2 = self.hero_cards
-        rank1, rank2 = card1.rank, card2.rank
-        suit1, suit2 = card1.suit, card2.suit
-        
-        # Rank ordering
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-        rank_order = {r: i for i, r in enumerate(ranks)}
-        
-        # Sort by rank (higher first)
-        if rank_order[rank1] < rank_order[rank2]:
-            rank1, rank2 = rank2, rank1
-            suit1, suit2 = suit2, suit1
-        
-        if rank1 == rank2:
-            return f"{rank1}{rank2}"  # Pocket pair
-        elif suit1 == suit2:
-            return f"{rank1}{rank2}s"  # Suited
-        else:
-            return f"{rank1}{rank2}o"  # Offsuit
+        return _cached_hand(card1.rank, card1.suit, card2.rank, card2.suit)
     
     def get_player_at_seat(self, seat: int) -> Optional[PlayerState]:
         """Get player at specific seat."""
@@ -9,6 +9,8 @@ Provides preflop and postflop recommendations based on:
 
 from typing import Optional
 from dataclasses import dataclass
+from bisect import bisect_right
+from collections import OrderedDict
 
 from app.poker.game_state import GameState
 from app.poker.push_fold import PushFoldCalculator
@@ -16,11 +18,67 @@ from app.poker.icm_calculator import ICMCalculator
 from app.db.charts import (
     get_opening_range, 
     get_3bet_range, 
-    is_hand_in_range,
     get_chart_stats
 )
 
 
+# Shared error responses (returned as-is, callers must not mutate)
+_ERROR_NO_HERO = {"error": "No hero cards detected"}
+_ERROR_NO_HAND = {"error": "Could not determine hero's hand"}
+
+# Shared action dict templates for recommendation builders. Templates are
+# merged with a per-call "reason"; constant entries are returned as-is and
+# must not be mutated.
+_FOLD_TMPL = {"action": "fold", "frequency": 1.0}
+_CALL_TMPL = {"action": "call", "frequency": 1.0}
+_PUSH_FOLD_FOLD_TMPL = {"action": "fold", "size": None, "frequency": 1.0}
+_VALUE_3BET_TMPL = {"action": "raise", "size": 3.0, "frequency": 1.0}  # 3x the open
+_BLUFF_3BET_TMPL = {"action": "raise", "size": 3.0, "frequency": 0.5}
+_PUSH_FOLD_ALT = {"action": "fold", "reason": "Folding loses equity"}
+_OPEN_FOLD_ALT = {"action": "fold", "frequency": 0.0, "reason": "Folding is -EV"}
+_VALUE_3BET_ALT = {"action": "call", "frequency": 0.0, "reason": "Occasionally flat to disguise"}
+_BLUFF_3BET_ALT = {"action": "fold", "frequency": 0.5, "reason": "Can also fold this hand"}
+_POSTFLOP_PRIMARY = {
+    "action": "check",
+    "frequency": 0.5,
+    "reason": "Postflop analysis - see solver for details",
+}
+
+# Max cached preflop recommendations per engine
+_REC_CACHE_SIZE = 1024
+
+# Response tiers vs a 3-bet, selected by hand strength:
+# < 0.70 fold, >= 0.70 blocker bluff (A5s-A3s only), >= 0.88 call, >= 0.94 4-bet
+_VS_3BET_BOUNDS = (0.70, 0.88, 0.94)
+_BLOCKER_BLUFF_HANDS = frozenset({"A5s", "A4s", "A3s"})
+_VS_3BET_RESPONSES = (
+    (
+        {"action": "fold", "frequency": 1.0,
+         "reason": "{hand} cannot profitably continue vs 3-bet"},
+        (),
+        False,
+    ),
+    (
+        {"action": "raise", "size": 2.25, "frequency": 0.4,
+         "reason": "4-bet {hand} as blocker bluff"},
+        ({"action": "fold", "frequency": 0.6, "reason": "Fold most of the time"},),
+        True,
+    ),
+    (
+        {"action": "call", "frequency": 0.7,
+         "reason": "Call with {hand}, evaluate flop"},
+        ({"action": "raise", "frequency": 0.3, "reason": "4-bet for value sometimes"},),
+        True,
+    ),
+    (
+        {"action": "raise", "size": 2.25, "frequency": 0.8,  # 4-bet
+         "reason": "4-bet {hand} for value"},
+        ({"action": "call", "frequency": 0.2, "reason": "Flat to trap occasionally"},),
+        True,
+    ),
+)
+
+
 @dataclass
 class ActionRecommendation:
     """Single action recommendation."""
@@ -53,6 +111,7 @@ class GTOEngine:
         self.table_format = table_format
         self.push_fold = PushFoldCalculator(table_format=table_format)
         self.icm = ICMCalculator()
+        self._rec_cache: OrderedDict[tuple, dict] = OrderedDict()
         
     def get_recommendations(self, game_state: GameState) -> dict:
         """
@@ -63,12 +122,12 @@ class GTOEngine:
         - alternatives: Other viable actions
         - analysis: Detailed analysis
         """
-        if game_state.hero is None or not game_state.hero_cards:
-            return {"error": "No hero cards detected"}
+        if not game_state.is_valid_hero:
+            return _ERROR_NO_HERO
         
         hero_hand = game_state.hero_hand
         if not hero_hand:
-            return {"error": "Could not determine hero's hand"}
+            return _ERROR_NO_HAND
         
         # Update table format from game state
         self.table_format = game_state.table_format
@@ -89,7 +148,56 @@ class GTOEngine:
         game_state: GameState,
         is_short_stack: bool,
     ) -> dict:
-        """Get preflop recommendation."""
+        """
+        Get preflop recommendation.
+        
+        Results are cached on everything they depend on, so repeated
+        frames of the same decision return the same (shared) dict.
+        """
+        # Determine facing action in a single pass over the table
+        facing_raise, facing_3bet, raiser_position = self._analyze_action(game_state)
+        players_behind = self._count_players_behind(game_state) if is_short_stack else 0
+        
+        cache_key = (
+            self.table_format,
+            game_state.hero_hand,
+            game_state.hero_position,
+            game_state.hero_stack_bb,
+            facing_raise,
+            facing_3bet,
+            raiser_position,
+            players_behind,
+        )
+        cached = self._rec_cache.get(cache_key)
+        if cached is not None:
+            self._rec_cache.move_to_end(cache_key)
+            return cached
+        
+        recommendation = self._build_preflop_recommendation(
+            game_state,
+            is_short_stack,
+            facing_raise,
+            facing_3bet,
+            raiser_position,
+            players_behind,
+        )
+        
+        self._rec_cache[cache_key] = recommendation
+        if len(self._rec_cache) > _REC_CACHE_SIZE:
+            self._rec_cache.popitem(last=False)
+        
+        return recommendation
+    
+    def _build_preflop_recommendation(
+        self,
+        game_state: GameState,
+        is_short_stack: bool,
+        facing_raise: bool,
+        facing_3bet: bool,
+        raiser_position: str,
+        players_behind: int,
+    ) -> dict:
+        """Build a preflop recommendation for the analyzed action."""
         hero_hand = game_state.hero_hand
         position = game_state.hero_position
         stack_bb = game_state.hero_stack_bb
@@ -103,8 +211,8 @@ class GTOEngine:
                 hand=hero_hand,
                 position=position,
                 stack_bb=stack_bb,
-                facing_raise=self._is_facing_raise(game_state),
-                num_players_behind=self._count_players_behind(game_state),
+                facing_raise=facing_raise,
+                num_players_behind=players_behind,
             )
             
             # Get push range percentage for notes
@@ -112,43 +220,26 @@ class GTOEngine:
             range_pct = self.push_fold.get_range_percentage(push_range)
             
             if pf_result.action == "push":
-                primary = ActionRecommendation(
-                    action="allin",
-                    size=stack_bb,
-                    frequency=1.0,
-                    ev=pf_result.equity,
-                    reason=f"Push with {hero_hand} from {position} at {stack_bb:.1f}BB",
-                )
-                alternatives = [
-                    ActionRecommendation(
-                        action="fold",
-                        frequency=0.0,
-                        reason="Folding loses equity",
-                    )
-                ]
+                primary = {
+                    "action": "allin",
+                    "size": stack_bb,
+                    "frequency": 1.0,
+                    "reason": f"Push with {hero_hand} from {position} at {stack_bb:.1f}BB",
+                }
+                alternatives = [_PUSH_FOLD_ALT]
             else:
-                primary = ActionRecommendation(
-                    action="fold",
-                    frequency=1.0,
-                    ev=0,
-                    reason=f"{hero_hand} not in push range from {position}",
-                )
+                primary = {
+                    **_PUSH_FOLD_FOLD_TMPL,
+                    "reason": f"{hero_hand} not in push range from {position}",
+                }
                 alternatives = []
             
             notes.append(f"Push/Fold mode: Stack = {stack_bb:.1f}BB")
             notes.append(f"Push range: {range_pct:.1f}% of hands")
             
             return {
-                "primary": {
-                    "action": primary.action,
-                    "size": primary.size,
-                    "frequency": primary.frequency,
-                    "reason": primary.reason,
-                },
-                "alternatives": [
-                    {"action": a.action, "reason": a.reason}
-                    for a in alternatives
-                ],
+                "primary": primary,
+                "alternatives": alternatives,
                 "hand": hero_hand,
                 "position": position,
                 "stack_bb": stack_bb,
@@ -162,16 +253,14 @@ class GTOEngine:
         # Regular preflop play
         hand_strength = self.push_fold.get_hand_strength(hero_hand)
         
-        # Determine if facing action
-        facing_raise = self._is_facing_raise(game_state)
-        facing_3bet = self._is_facing_3bet(game_state)
-        
         if not facing_raise and not facing_3bet:
             # First to act or limped pot
             return self._get_open_raise_recommendation(game_state, hand_strength)
         elif facing_raise and not facing_3bet:
             # Facing open raise
-            return self._get_vs_raise_recommendation(game_state, hand_strength)
+            return self._get_vs_raise_recommendation(
+                game_state, hand_strength, raiser_position
+            )
         else:
             # Facing 3bet
             return self._get_vs_3bet_recommendation(game_state, hand_strength)
@@ -188,10 +277,11 @@ class GTOEngine:
         
         # Get opening range from JSON charts
         open_data = get_opening_range(position, self.table_format)
-        open_range = open_data.get("raise", [])
+        open_range = open_data["raise"]
         raise_size = open_data.get("raise_size", 2.5)
         
-        in_range = is_hand_in_range(hero_hand, open_range)
+        # hero_hand is already canonical, so a plain set lookup suffices
+        in_range = hero_hand in open_range
         range_pct = self.push_fold.get_range_percentage(open_range)
         
         if in_range:
@@ -201,13 +291,10 @@ class GTOEngine:
                 "frequency": 1.0,
                 "reason": f"Open raise {hero_hand} from {position}",
             }
-            alternatives = [
-                {"action": "fold", "frequency": 0.0, "reason": "Folding is -EV"},
-            ]
+            alternatives = [_OPEN_FOLD_ALT]
         else:
             primary = {
-                "action": "fold",
-                "frequency": 1.0,
+                **_FOLD_TMPL,
                 "reason": f"{hero_hand} outside opening range from {position}",
             }
             alternatives = []
@@ -232,57 +319,41 @@ class GTOEngine:
         self,
         game_state: GameState,
         hand_strength: float,
+        villain_position: str,
     ) -> dict:
         """Get recommendation when facing a raise."""
         position = game_state.hero_position
         hero_hand = game_state.hero_hand
         stack_bb = game_state.hero_stack_bb
         
-        # Determine villain's position
-        villain_position = self._get_raiser_position(game_state)
-        
         # Get 3-bet range from JSON charts
         three_bet_data = get_3bet_range(villain_position)
-        value_range = three_bet_data.get("3bet_value", [])
-        bluff_range = three_bet_data.get("3bet_bluff", [])
-        call_range = three_bet_data.get("call", [])
-        
-        in_value = is_hand_in_range(hero_hand, value_range)
-        in_bluff = is_hand_in_range(hero_hand, bluff_range)
-        in_call = is_hand_in_range(hero_hand, call_range)
+        in_value = hero_hand in three_bet_data["3bet_value"]
+        in_bluff = hero_hand in three_bet_data["3bet_bluff"]
+        in_call = hero_hand in three_bet_data["call"]
         
         # Determine action
         if in_value:
             primary = {
-                "action": "raise",
-                "size": 3.0,  # 3x the open
-                "frequency": 1.0,
+                **_VALUE_3BET_TMPL,
                 "reason": f"3-bet {hero_hand} for value vs {villain_position}",
             }
-            alternatives = [
-                {"action": "call", "frequency": 0.0, "reason": "Occasionally flat to disguise"},
-            ]
+            alternatives = [_VALUE_3BET_ALT]
         elif in_bluff:
             primary = {
-                "action": "raise",
-                "size": 3.0,
-                "frequency": 0.5,
+                **_BLUFF_3BET_TMPL,
                 "reason": f"3-bet {hero_hand} as bluff vs {villain_position}",
             }
-            alternatives = [
-                {"action": "fold", "frequency": 0.5, "reason": "Can also fold this hand"},
-            ]
+            alternatives = [_BLUFF_3BET_ALT]
         elif in_call:
             primary = {
-                "action": "call",
-                "frequency": 1.0,
+                **_CALL_TMPL,
                 "reason": f"Call with {hero_hand} vs {villain_position} raise",
             }
             alternatives = []
         else:
             primary = {
-                "action": "fold",
-                "frequency": 1.0,
+                **_FOLD_TMPL,
                 "reason": f"{hero_hand} not strong enough vs {villain_position}",
             }
             alternatives = []
@@ -314,59 +385,16 @@ class GTOEngine:
         stack_bb = game_state.hero_stack_bb
         
         # Only continue with premium hands vs 3-bet
-        if hand_strength >= 0.94:  # QQ+, AKs
-            primary = {
-                "action": "raise",  # 4-bet
-                "size": 2.25,
-                "frequency": 0.8,
-                "reason": f"4-bet {hero_hand} for value",
-            }
-            alternatives = [
-                {"action": "call", "frequency": 0.2, "reason": "Flat to trap occasionally"},
-            ]
-            in_range = True
-        elif hand_strength >= 0.88:  # JJ, AKo, QQ
-            primary = {
-                "action": "call",
-                "frequency": 0.7,
-                "reason": f"Call with {hero_hand}, evaluate flop",
-            }
-            alternatives = [
-                {"action": "raise", "frequency": 0.3, "reason": "4-bet for value sometimes"},
-            ]
-            in_range = True
-        elif hand_strength >= 0.70:  # A5s (blocker bluff)
-            if hero_hand in ["A5s", "A4s", "A3s"]:
-                primary = {
-                    "action": "raise",
-                    "size": 2.25,
-                    "frequency": 0.4,
-                    "reason": f"4-bet {hero_hand} as blocker bluff",
-                }
-                alternatives = [
-                    {"action": "fold", "frequency": 0.6, "reason": "Fold most of the time"},
-                ]
-                in_range = True
-            else:
-                primary = {
-                    "action": "fold",
-                    "frequency": 1.0,
-                    "reason": f"{hero_hand} cannot profitably continue vs 3-bet",
-                }
-                alternatives = []
-                in_range = False
-        else:
-            primary = {
-                "action": "fold",
-                "frequency": 1.0,
-                "reason": f"{hero_hand} cannot profitably continue vs 3-bet",
-            }
-            alternatives = []
-            in_range = False
+        tier = bisect_right(_VS_3BET_BOUNDS, hand_strength)
+        if tier == 1 and hero_hand not in _BLOCKER_BLUFF_HANDS:
+            tier = 0
+        
+        primary_tmpl, alternatives, in_range = _VS_3BET_RESPONSES[tier]
+        primary = {**primary_tmpl, "reason": primary_tmpl["reason"].format(hand=hero_hand)}
         
         return {
             "primary": primary,
-            "alternatives": alternatives,
+            "alternatives": list(alternatives),
             "hand": hero_hand,
             "position": position,
             "stack_bb": stack_bb,
@@ -385,11 +413,7 @@ class GTOEngine:
         pot_bb = game_state.pot_bb
         
         return {
-            "primary": {
-                "action": "check",
-                "frequency": 0.5,
-                "reason": "Postflop analysis - see solver for details",
-            },
+            "primary": _POSTFLOP_PRIMARY,
             "alternatives": [
                 {"action": "bet", "size": pot_bb * 0.5, "frequency": 0.5, "reason": "Standard c-bet"},
             ],
@@ -404,20 +428,30 @@ class GTOEngine:
             "notes": [f"Street: {street}", "Full postflop solver coming soon"],
         }
     
-    def _is_facing_raise(self, game_state: GameState) -> bool:
-        """Check if hero is facing a raise."""
+    def _analyze_action(self, game_state: GameState) -> tuple[bool, bool, str]:
+        """
+        Scan the table once for preflop aggression.
+        
+        Returns (facing_raise, facing_3bet, raiser_position) where the
+        raiser is the first opponent betting more than the big blind.
+        """
+        big_blind = game_state.big_blind
+        three_bet_size = big_blind * 2
+        
+        raiser_position = None
+        any_3bet_size = False
+        
         for player in game_state.players:
-            if not player.is_hero and player.current_bet > game_state.big_blind:
-                return True
-        return False
-    
-    def _is_facing_3bet(self, game_state: GameState) -> bool:
-        """Check if hero is facing a 3-bet (re-raise)."""
-        raise_count = sum(
-            1 for p in game_state.players
-            if p.current_bet > game_state.big_blind * 2
-        )
-        return raise_count >= 1 and self._is_facing_raise(game_state)
+            bet = player.current_bet
+            if bet > three_bet_size:
+                any_3bet_size = True
+            if raiser_position is None and not player.is_hero and bet > big_blind:
+                raiser_position = player.position or "UTG"
+        
+        facing_raise = raiser_position is not None
+        facing_3bet = facing_raise and any_3bet_size
+        
+        return facing_raise, facing_3bet, raiser_position or "UTG"
     
     def _count_players_behind(self, game_state: GameState) -> int:
         """Count active players yet to act."""
@@ -425,17 +459,10 @@ class GTOEngine:
         if not hero:
             return 0
         
-        return sum(
-            1 for p in game_state.players
-            if p.is_active and not p.is_hero and not p.is_turn
-        )
-    
-    def _get_raiser_position(self, game_state: GameState) -> str:
-        """Get the position of the player who raised."""
-        for player in game_state.players:
-            if not player.is_hero and player.current_bet > game_state.big_blind:
-                return player.position or "UTG"
-        return "UTG"
+        count = 0
+        for p in game_state.players:
+            count += p.is_active and not p.is_hero and not p.is_turn
+        return count
     
     def get_chart_info(self) -> dict:
         """Get information about loaded charts."""
@@ -0,0 +1,92 @@
+"""
+Canonical encoding of the 169 preflop starting hands.
+
+Hands are laid out on the standard 13x13 grid with ranks descending
+(row/column 0 = Ace):
+- diagonal (r == c): pocket pairs ("AA", "KK", ...)
+- above diagonal (r < c): suited hands ("AKs")
+- below diagonal (r > c): offsuit hands ("AKo")
+
+The integer id of a hand is ``r * 13 + c``.
+"""
+
+from typing import Optional
+
+
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
+
+# Rank strength (2 = 0 ... A = 12)
+RANK_ORDER = {r: i for i, r in enumerate(RANKS)}
+
+# Grid order (A = 0 ... 2 = 12)
+GRID_RANKS = RANKS[::-1]
+GRID_INDEX = {r: i for i, r in enumerate(GRID_RANKS)}
+
+NUM_HANDS = 169
+
+
+def rc_to_hand(r: int, c: int) -> str:
+    """Convert grid coordinates to hand notation (e.g., (0, 1) -> 'AKs')."""
+    if r == c:
+        return f"{GRID_RANKS[r]}{GRID_RANKS[c]}"
+    if r < c:
+        return f"{GRID_RANKS[r]}{GRID_RANKS[c]}s"
+    return f"{GRID_RANKS[c]}{GRID_RANKS[r]}o"
+
+
+CANONICAL_HANDS: tuple[str, ...] = tuple(
+    rc_to_hand(r, c) for r in range(13) for c in range(13)
+)
+
+HAND_INDEX: dict[str, int] = {hand: i for i, hand in enumerate(CANONICAL_HANDS)}
+
+
+def normalize_hand(hand: str) -> str:
+    """Normalize hand notation (e.g., 'KAs' -> 'AKs')."""
+    if hand in HAND_INDEX:
+        return hand
+    
+    if len(hand) < 2:
+        return hand
+    
+    r1, r2 = hand[0].upper(), hand[1].upper()
+    suffix = hand[2:].lower() if len(hand) > 2 else ""
+    
+    # Sort ranks (higher first)
+    if RANK_ORDER.get(r1, 0) < RANK_ORDER.get(r2, 0):
+        r1, r2 = r2, r1
+    
+    # Pairs don't have suffix
+    if r1 == r2:
+        return f"{r1}{r2}"
+    
+    return f"{r1}{r2}{suffix}"
+
+
+def hand_id(hand: str) -> Optional[int]:
+    """Get the canonical integer id of a hand, or None if not a valid hand."""
+    idx = HAND_INDEX.get(hand)
+    if idx is None:
+        idx = HAND_INDEX.get(normalize_hand(hand))
+    return idx
+
+
+def hand_to_rc(hand: str) -> tuple[int, int]:
+    """Convert hand notation to grid coordinates (e.g., 'AKo' -> (1, 0))."""
+    idx = hand_id(hand)
+    if idx is None:
+        raise ValueError(f"Invalid hand notation: {hand}")
+    return divmod(idx, 13)
+
+
+def cards_to_hand(rank1: str, suit1: str, rank2: str, suit2: str) -> str:
+    """Convert two hole cards to hand notation (e.g., As, Kd -> 'AKo')."""
+    if RANK_ORDER[rank1] < RANK_ORDER[rank2]:
+        rank1, rank2 = rank2, rank1
+    
+    if rank1 == rank2:
+        return f"{rank1}{rank2}"  # Pocket pair
+    elif suit1 == suit2:
+        return f"{rank1}{rank2}s"  # Suited
+    else:
+        return f"{rank1}{rank2}o"  # Offsuit
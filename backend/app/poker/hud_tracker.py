@@ -14,10 +14,14 @@ Statistics tracked:
 - W$SD (Won $ at Showdown %)
 """
 
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
+from operator import attrgetter
 from typing import Optional
-from datetime import datetime
 from enum import Enum
+import time
+
+import numpy as np
 
 
 class Action(Enum):
@@ -38,18 +42,36 @@ class Street(Enum):
     RIVER = "river"
 
 
-@dataclass
+# Action/street values as plain strings for the record_action hot path
+_ACTIONS = frozenset(a.value for a in Action)
+_STREETS = frozenset(s.value for s in Street)
+_VOLUNTARY_ACTIONS = frozenset({"call", "bet", "raise", "allin"})
+_AGGRESSIVE_ACTIONS = frozenset({"bet", "raise", "allin"})
+_RAISE_ACTIONS = frozenset({"raise", "allin"})
+
+# Player type by VPIP bucket (< 20, < 30, 30+) and PFR bucket
+# (<= 15, <= 18, <= 20, > 20)
+_VPIP_BOUNDS = (20, 30)
+_PFR_BOUNDS = (15, 18, 20)
+_PLAYER_TYPES = (
+    ("Rock", "TAG", "TAG", "TAG"),
+    ("Weak-Tight", "Weak-Tight", "LAG", "LAG"),
+    ("Fish", "Fish", "Fish", "Maniac"),
+)
+
+
+@dataclass(slots=True)
 class ActionRecord:
     """Record of a single action."""
-    street: Street
-    action: Action
+    street: str  # Street value, e.g. "preflop"
+    action: str  # Action value, e.g. "raise"
     amount: float = 0
     is_voluntary: bool = False  # Was this a voluntary put money in pot?
     facing_bet: float = 0  # Size of bet player was facing
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: Optional[float] = None  # time.monotonic(), if tracking enabled
 
 
-@dataclass
+@dataclass(slots=True)
 class HandRecord:
     """Record of a single hand for a player."""
     hand_id: str
@@ -59,36 +81,28 @@ class HandRecord:
     won_at_showdown: bool = False
     final_pot: float = 0
     
+    # Per-hand stat flags (set once by HUDTracker.record_action)
+    vpip_counted: bool = False
+    pfr_counted: bool = False
+    three_bet_counted: bool = False
+    
     @property
     def vpip(self) -> bool:
         """Did player voluntarily put money in pot preflop?"""
-        for action in self.actions:
-            if action.street == Street.PREFLOP and action.is_voluntary:
-                return True
-        return False
+        return self.vpip_counted
     
     @property
     def pfr(self) -> bool:
         """Did player raise preflop?"""
-        for action in self.actions:
-            if action.street == Street.PREFLOP and action.action in [Action.RAISE, Action.ALLIN]:
-                return True
-        return False
+        return self.pfr_counted
     
     @property
     def three_bet(self) -> bool:
         """Did player 3-bet preflop?"""
-        raise_count = 0
-        for action in self.actions:
-            if action.street == Street.PREFLOP:
-                if action.action in [Action.RAISE, Action.ALLIN]:
-                    raise_count += 1
-                    if raise_count >= 2:  # Player made the 2nd raise = 3-bet
-                        return True
-        return False
+        return self.three_bet_counted
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerStats:
     """Aggregated statistics for a player."""
     player_id: str
@@ -126,6 +140,10 @@ class PlayerStats:
     # Position stats (optional detailed breakdown)
     stats_by_position: dict = field(default_factory=dict)
     
+    # Cached to_dict() output; HUDTracker sets _dirty when counters change
+    _cached_dict: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _dirty: bool = field(default=True, init=False, repr=False, compare=False)
+    
     @property
     def vpip_pct(self) -> float:
         """VPIP percentage."""
@@ -162,10 +180,10 @@ class PlayerStats:
         return (self.cbet_count / self.cbet_opportunities) * 100
     
     @property
-    def aggression_factor(self) -> float:
-        """Aggression Factor (AF) = (Bets + Raises) / Calls."""
+    def aggression_factor(self) -> Optional[float]:
+        """Aggression Factor (AF) = (Bets + Raises) / Calls, None without calls."""
         if self.calls == 0:
-            return float('inf') if self.bets_and_raises > 0 else 0.0
+            return None
         return self.bets_and_raises / self.calls
     
     @property
@@ -183,8 +201,12 @@ class PlayerStats:
         return (self.won_at_showdown / self.went_to_showdown) * 100
     
     def to_dict(self) -> dict:
-        """Convert stats to dictionary for display."""
-        return {
+        """Convert stats to dictionary for display (cached until dirty)."""
+        if not self._dirty and self._cached_dict is not None:
+            return self._cached_dict
+        
+        af = self.aggression_factor
+        self._cached_dict = {
             "player_name": self.player_name,
             "hands": self.total_hands,
             "vpip": round(self.vpip_pct, 1),
@@ -192,10 +214,12 @@ class PlayerStats:
             "3bet": round(self.three_bet_pct, 1),
             "fold_to_3bet": round(self.fold_to_three_bet_pct, 1),
             "cbet": round(self.cbet_pct, 1),
-            "af": round(self.aggression_factor, 1) if self.aggression_factor != float('inf') else "∞",
+            "af": "∞" if af is None and self.bets_and_raises > 0 else round(af or 0.0, 1),
             "wtsd": round(self.wtsd_pct, 1),
             "wsd": round(self.wsd_pct, 1),
         }
+        self._dirty = False
+        return self._cached_dict
     
     def get_summary(self) -> str:
         """Get one-line summary for HUD display."""
@@ -206,27 +230,74 @@ class PlayerStats:
         if self.total_hands < 20:
             return "Unknown"
         
-        vpip = self.vpip_pct
-        pfr = self.pfr_pct
-        
         # Tight = VPIP < 20%, Loose = VPIP > 30%
         # Passive = PFR < 15%, Aggressive = PFR > 20%
-        
-        if vpip < 20:
-            if pfr > 15:
-                return "TAG"  # Tight-Aggressive (good player)
-            else:
-                return "Rock"  # Tight-Passive (very tight)
-        elif vpip < 30:
-            if pfr > 18:
-                return "LAG"  # Loose-Aggressive
-            else:
-                return "Weak-Tight"
-        else:
-            if pfr > 20:
-                return "Maniac"  # Very loose and aggressive
-            else:
-                return "Fish"  # Loose-Passive (calling station)
+        vpip_bucket = bisect_right(_VPIP_BOUNDS, self.vpip_pct)
+        pfr_bucket = bisect_left(_PFR_BOUNDS, self.pfr_pct)
+        return _PLAYER_TYPES[vpip_bucket][pfr_bucket]
+
+
+# Counter columns gathered for batch export, and (numerator, denominator)
+# column pairs for each percentage stat in to_dict order (without af)
+_EXPORT_COUNTERS = (
+    "total_hands", "vpip_hands", "pfr_hands",
+    "three_bet_opportunities", "three_bet_count",
+    "faced_three_bet", "folded_to_three_bet",
+    "cbet_opportunities", "cbet_count",
+    "went_to_showdown", "won_at_showdown",
+    "bets_and_raises", "calls",
+)
+_get_counters = attrgetter(*_EXPORT_COUNTERS)
+_PCT_NUM = [1, 2, 4, 6, 8, 9, 10]  # vpip, pfr, 3bet, fold_to_3bet, cbet, wtsd, wsd
+_PCT_DEN = [0, 0, 3, 5, 7, 1, 9]
+
+
+def _batch_stats_dicts(players: list[PlayerStats]) -> list[dict]:
+    """
+    Build to_dict() output for many players at once.
+    
+    Counters are gathered into one matrix so every percentage is a single
+    vectorized division instead of per-player property calls.
+    """
+    if not players:
+        return []
+    
+    counts = np.array([_get_counters(p) for p in players], dtype=np.float64)
+    
+    num = counts[:, _PCT_NUM]
+    den = counts[:, _PCT_DEN]
+    pcts = np.divide(num, den, out=np.zeros_like(num), where=den > 0) * 100
+    pcts = np.round(pcts, 1).tolist()
+    
+    bets, calls = counts[:, 11], counts[:, 12]
+    af = np.divide(bets, calls, out=np.zeros_like(bets), where=calls > 0)
+    af = np.round(af, 1).tolist()
+    af_inf = ((calls == 0) & (bets > 0)).tolist()
+    
+    return [
+        {
+            "player_name": p.player_name,
+            "hands": p.total_hands,
+            "vpip": row[0],
+            "pfr": row[1],
+            "3bet": row[2],
+            "fold_to_3bet": row[3],
+            "cbet": row[4],
+            "af": "∞" if inf else a,
+            "wtsd": row[5],
+            "wsd": row[6],
+        }
+        for p, row, a, inf in zip(players, pcts, af, af_inf)
+    ]
+
+
+def _cached_stats_dicts(players: list[PlayerStats]) -> list[dict]:
+    """Get to_dict() output for many players, recomputing only dirty ones."""
+    stale = [p for p in players if p._dirty or p._cached_dict is None]
+    for stats, data in zip(stale, _batch_stats_dicts(stale)):
+        stats._cached_dict = data
+        stats._dirty = False
+    return [p._cached_dict for p in players]
 
 
 class HUDTracker:
@@ -234,7 +305,10 @@ class HUDTracker:
     Tracks HUD statistics for all observed players.
     """
     
-    def __init__(self):
+    def __init__(self, track_timestamps: bool = False):
+        # Record time.monotonic() on each action (off by default)
+        self.track_timestamps = track_timestamps
+        
         # Player stats by player ID
         self.players: dict[str, PlayerStats] = {}
         
@@ -245,12 +319,13 @@ class HUDTracker:
     
     def get_or_create_player(self, player_id: str, player_name: str = "") -> PlayerStats:
         """Get existing player stats or create new."""
-        if player_id not in self.players:
-            self.players[player_id] = PlayerStats(
+        stats = self.players.get(player_id)
+        if stats is None:
+            stats = self.players[player_id] = PlayerStats(
                 player_id=player_id,
                 player_name=player_name or player_id,
             )
-        return self.players[player_id]
+        return stats
     
     def start_new_hand(self, hand_id: str, players: list[dict]):
         """
@@ -261,19 +336,19 @@ class HUDTracker:
             players: List of player dicts with {id, name, position, stack}
         """
         self.current_hand_id = hand_id
-        self.current_hand = {}
         self.current_pfr_player = None
         
-        for player in players:
-            player_id = player.get("id", player.get("name", ""))
-            self.current_hand[player_id] = HandRecord(
-                hand_id=hand_id,
-                position=player.get("position", ""),
-            )
-            
-            # Increment hand count
+        player_ids = [player.get("id", player.get("name", "")) for player in players]
+        self.current_hand = {
+            player_id: HandRecord(hand_id=hand_id, position=player.get("position", ""))
+            for player_id, player in zip(player_ids, players)
+        }
+        
+        # Increment hand count
+        for player_id, player in zip(player_ids, players):
             stats = self.get_or_create_player(player_id, player.get("name", ""))
             stats.total_hands += 1
+            stats._dirty = True
     
     def record_action(
         self,
@@ -293,67 +368,82 @@ class HUDTracker:
             amount: Action amount
             facing_bet: Size of bet player is facing
         """
-        if player_id not in self.current_hand:
+        hand_record = self.current_hand.get(player_id)
+        if hand_record is None:
             return
         
-        action_enum = Action(action.lower())
-        street_enum = Street(street.lower())
+        action = action.lower()
+        street = street.lower()
+        if action not in _ACTIONS:
+            raise ValueError(f"{action!r} is not a valid Action")
+        if street not in _STREETS:
+            raise ValueError(f"{street!r} is not a valid Street")
         
         # Determine if voluntary
-        is_voluntary = action_enum in [Action.CALL, Action.BET, Action.RAISE, Action.ALLIN]
+        is_voluntary = action in _VOLUNTARY_ACTIONS
         
         record = ActionRecord(
-            street=street_enum,
-            action=action_enum,
+            street=street,
+            action=action,
             amount=amount,
             is_voluntary=is_voluntary,
             facing_bet=facing_bet,
         )
+        if self.track_timestamps:
+            record.timestamp = time.monotonic()
         
-        self.current_hand[player_id].actions.append(record)
+        hand_record.actions.append(record)
         
         # Update stats
         stats = self.get_or_create_player(player_id)
+        stats._dirty = True
         
-        # Preflop stats
-        if street_enum == Street.PREFLOP:
-            if is_voluntary:
+        # Preflop stats (each counted at most once per hand)
+        if street == "preflop":
+            if is_voluntary and not hand_record.vpip_counted:
                 stats.vpip_hands += 1
+                hand_record.vpip_counted = True
             
-            if action_enum in [Action.RAISE, Action.ALLIN]:
-                stats.pfr_hands += 1
+            if action in _RAISE_ACTIONS:
+                if not hand_record.pfr_counted:
+                    stats.pfr_hands += 1
+                    hand_record.pfr_counted = True
                 
                 # Check if this is a 3-bet (re-raise)
                 if self.current_pfr_player and self.current_pfr_player != player_id:
-                    stats.three_bet_count += 1
+                    if not hand_record.three_bet_counted:
+                        stats.three_bet_count += 1
+                        hand_record.three_bet_counted = True
                 else:
                     self.current_pfr_player = player_id
         
         # Postflop aggression
-        if street_enum != Street.PREFLOP:
-            if action_enum in [Action.BET, Action.RAISE, Action.ALLIN]:
+        else:
+            is_aggressive = action in _AGGRESSIVE_ACTIONS
+            if is_aggressive:
                 stats.bets_and_raises += 1
-            elif action_enum == Action.CALL:
+            elif action == "call":
                 stats.calls += 1
             
             # C-Bet tracking
-            if street_enum == Street.FLOP and player_id == self.current_pfr_player:
+            if street == "flop" and player_id == self.current_pfr_player:
                 stats.cbet_opportunities += 1
-                if action_enum in [Action.BET, Action.RAISE, Action.ALLIN]:
+                if is_aggressive:
                     stats.cbet_count += 1
     
     def record_showdown(self, player_id: str, won: bool):
         """Record showdown result for a player."""
-        if player_id not in self.current_hand:
+        hand_record = self.current_hand.get(player_id)
+        if hand_record is None:
             return
         
-        self.current_hand[player_id].went_to_showdown = True
-        self.current_hand[player_id].won_at_showdown = won
+        hand_record.went_to_showdown = True
+        hand_record.won_at_showdown = won
         
         stats = self.get_or_create_player(player_id)
+        stats._dirty = True
         stats.went_to_showdown += 1
-        if won:
-            stats.won_at_showdown += 1
+        stats.won_at_showdown += bool(won)
     
     def end_hand(self):
         """Finalize the current hand."""
@@ -369,7 +459,7 @@ class HUDTracker:
     
     def get_all_stats(self) -> list[dict]:
         """Get stats for all tracked players."""
-        return [stats.to_dict() for stats in self.players.values()]
+        return _cached_stats_dicts(list(self.players.values()))
     
     def get_hud_display(self, player_id: str) -> Optional[str]:
         """Get HUD display string for a player."""
@@ -385,10 +475,10 @@ class HUDTracker:
     
     def export_stats(self) -> dict:
         """Export all stats as JSON-serializable dict."""
-        return {
-            player_id: stats.to_dict()
-            for player_id, stats in self.players.items()
-        }
+        return dict(zip(
+            self.players.keys(),
+            _cached_stats_dicts(list(self.players.values())),
+        ))
     
     def import_stats(self, data: dict):
         """Import stats from saved data."""
@@ -401,5 +491,6 @@ class HUDTracker:
             
             stats = self.players[player_id]
             stats.total_hands = stats_dict.get("hands", 0)
+            stats._dirty = True
             # Note: Detailed stats would need to be stored separately
             # This is a simplified import for basic stats
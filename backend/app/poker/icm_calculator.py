@@ -7,10 +7,16 @@ and remaining stack sizes.
 
 from typing import Optional
 from dataclasses import dataclass
+from functools import lru_cache
 from itertools import permutations
 
+import numpy as np
 
-@dataclass
+
+_ICM_CACHE_SIZE = 4096
+
+
+@dataclass(slots=True, frozen=True)
 class ICMResult:
     """Result of ICM calculation."""
     chip_ev: float  # Expected value in chips
@@ -28,7 +34,8 @@ class ICMCalculator:
     """
     
     def __init__(self):
-        self._cache = {}
+        # Memoized ICM equity keyed by exact stacks
+        self._icm_cache = lru_cache(maxsize=_ICM_CACHE_SIZE)(self._cached_icm)
     
     def calculate_icm_equity(
         self,
@@ -55,6 +62,20 @@ class ICMCalculator:
         if total_chips == 0:
             return 0.0
         
+        # A busted hero collects nothing
+        if stacks[hero_index] <= 0:
+            return 0.0
+        
+        return self._icm_cache(tuple(stacks), tuple(payouts), hero_index)
+    
+    def _cached_icm(
+        self,
+        stacks: tuple[float, ...],
+        payouts: tuple[float, ...],
+        hero_index: int,
+    ) -> float:
+        """Calculate ICM equity from stacks (cached)."""
+        total_chips = sum(stacks)
         normalized_stacks = [s / total_chips for s in stacks]
         
         # Use Malmuth-Harville method
@@ -88,70 +109,75 @@ class ICMCalculator:
         payouts: list[float],
         hero_index: int,
     ) -> float:
-        """Exact ICM using recursive probability calculation."""
+        """Exact ICM from hero's finish-position probabilities."""
+        if stacks[hero_index] <= 0:
+            return 0.0
+        
         n_players = len(stacks)
         n_payouts = min(len(payouts), n_players)
         
-        # Calculate probability of each finish position for hero
-        finish_probs = [0.0] * n_payouts
-        
-        # Probability of finishing 1st = stack proportion
-        finish_probs[0] = stacks[hero_index]
+        # Trailing zero payouts contribute nothing, skip their positions
+        while n_payouts and payouts[n_payouts - 1] == 0:
+            n_payouts -= 1
+        if not n_payouts:
+            return 0.0
         
-        # For other positions, calculate conditional probabilities
-        for pos in range(1, n_payouts):
-            prob = self._prob_finish_position(stacks, hero_index, pos)
-            finish_probs[pos] = prob
+        finish_probs = self._finish_probabilities(stacks, hero_index, n_payouts)
         
         # Expected value = sum of (probability * payout)
         ev = sum(p * payouts[i] for i, p in enumerate(finish_probs))
         return ev
     
-    def _prob_finish_position(
+    def _finish_probabilities(
         self,
         stacks: list[float],
         hero_index: int,
-        position: int,
-    ) -> float:
+        n_positions: int,
+    ) -> list[float]:
         """
-        Calculate probability of hero finishing in given position.
+        Calculate probabilities of hero finishing in each of the top positions.
         
-        Uses recursive Malmuth-Harville formula.
+        Malmuth-Harville evaluated bottom-up over subsets of players still
+        in contention (bitmasks), so every subset is solved once instead of
+        once per elimination order.
         """
         n = len(stacks)
-        if position == 0:
-            return stacks[hero_index]
+        full_mask = (1 << n) - 1
+        hero_bit = 1 << hero_index
+        hero_stack = stacks[hero_index]
         
-        # Sum over all players who could finish before hero
-        prob = 0.0
-        for i in range(n):
-            if i == hero_index:
+        # Chip total of every subset
+        sum_mask = [0.0] * (full_mask + 1)
+        for mask in range(1, full_mask + 1):
+            low_bit = mask & -mask
+            sum_mask[mask] = sum_mask[mask ^ low_bit] + stacks[low_bit.bit_length() - 1]
+        
+        villains = [(1 << i, stacks[i]) for i in range(n) if i != hero_index]
+        
+        # probs[mask][pos] = P(hero finishes pos-th among players in mask).
+        # Submasks are numerically smaller, so increasing order is safe.
+        probs: list[Optional[list[float]]] = [None] * (full_mask + 1)
+        for mask in range(hero_bit, full_mask + 1):
+            if not mask & hero_bit:
                 continue
             
-            # Probability that player i finishes first
-            # multiplied by probability hero finishes in (position-1) of remaining
-            p_i_first = stacks[i]
-            
-            # Remaining stacks without player i
-            remaining_stacks = stacks[:i] + stacks[i+1:]
-            new_hero_idx = hero_index if hero_index < i else hero_index - 1
-            
-            # Renormalize
-            total = sum(remaining_stacks)
+            row = [0.0] * n_positions
+            total = sum_mask[mask]
             if total > 0:
-                remaining_stacks = [s / total for s in remaining_stacks]
-                
-                # Recursive probability
-                if position == 1:
-                    p_hero_next = remaining_stacks[new_hero_idx]
-                else:
-                    p_hero_next = self._prob_finish_position(
-                        remaining_stacks, new_hero_idx, position - 1
-                    )
-                
-                prob += p_i_first * p_hero_next
-        
-        return prob
+                row[0] = hero_stack / total
+                for bit, stack in villains:
+                    if not mask & bit or not stack:
+                        continue
+                    
+                    # Villain takes the top spot, hero finishes one place lower
+                    p_first = stack / total
+                    sub_row = probs[mask ^ bit]
+                    for pos in range(1, n_positions):
+                        row[pos] += p_first * sub_row[pos - 1]
+            
+            probs[mask] = row
+        
+        return probs[full_mask]
     
     def _approximate_icm(
         self,
@@ -175,20 +201,23 @@ class ICMCalculator:
         
         Returns a multiplier (0.5 = very tight, 1.0 = neutral, 1.2 = can be looser).
         """
-        n_players = len(stacks)
-        hero_stack = stacks[hero_index]
-        avg_stack = sum(stacks) / n_players
+        stacks_np = np.asarray(stacks, dtype=np.float64)
+        n_players = len(stacks_np)
         
         # Calculate relative stack size
-        rel_stack = hero_stack / avg_stack
+        rel_stack = stacks_np[hero_index] / stacks_np.mean()
         
         # Calculate payout jumps
         if len(payouts) < 2:
             return 1.0
         
-        # Find where hero is likely to finish
-        sorted_indices = sorted(range(n_players), key=lambda i: stacks[i], reverse=True)
-        hero_rank = sorted_indices.index(hero_index)
+        # Find where hero is likely to finish: bigger stacks plus tied
+        # stacks seated before hero are ranked ahead
+        hero_stack = stacks_np[hero_index]
+        hero_rank = int(
+            np.count_nonzero(stacks_np > hero_stack)
+            + np.count_nonzero(stacks_np[:hero_index] == hero_stack)
+        )
         
         # ICM pressure is higher when:
         # 1. Near bubble or payout jump
@@ -235,16 +264,11 @@ class ICMCalculator:
         win_amount = min(hero_stack, villain_stack)
         win_stacks[hero_index] += win_amount
         win_stacks[villain_index] -= win_amount
+        win_hero_idx = hero_index
         if win_stacks[villain_index] <= 0:
-            win_stacks = [s for i, s in enumerate(win_stacks) if i != villain_index]
-            win_hero_idx = hero_index if villain_index > hero_index else hero_index
-            # Adjust index if villain was removed before hero
-            if villain_index < hero_index:
-                win_hero_idx = hero_index - 1
-            else:
-                win_hero_idx = hero_index
-        else:
-            win_hero_idx = hero_index
+            # Villain busts; hero shifts down if villain was seated before
+            del win_stacks[villain_index]
+            win_hero_idx -= villain_index < hero_index
         
         win_icm = self.calculate_icm_equity(win_stacks, payouts, win_hero_idx)
         
@@ -5,13 +5,16 @@ Based on Nash equilibrium solutions for push/fold scenarios,
 loaded from JSON chart files.
 """
 
-from typing import Optional
+from types import MappingProxyType
+from typing import Collection, Mapping, Optional
 from dataclasses import dataclass
+from functools import lru_cache
 
 from app.db.charts import get_push_fold_range, get_call_range, is_hand_in_range
+from app.poker.hand_encoding import CANONICAL_HANDS, hand_id, normalize_hand
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PushFoldDecision:
     """Result of push/fold analysis."""
     action: str  # "push", "fold", "call"
@@ -23,7 +26,7 @@ class PushFoldDecision:
 
 # Hand rankings (higher = better)
 # Based on Sklansky-Chubukov rankings for push/fold play
-HAND_RANKINGS = {
+HAND_RANKINGS: Mapping[str, float] = MappingProxyType({
     # Pocket pairs
     "AA": 1.00, "KK": 0.98, "QQ": 0.96, "JJ": 0.94, "TT": 0.90,
     "99": 0.85, "88": 0.80, "77": 0.75, "66": 0.70, "55": 0.65,
@@ -94,7 +97,57 @@ HAND_RANKINGS = {
     "54o": 0.28, "53o": 0.20, "52o": 0.16,
     "43o": 0.22, "42o": 0.18,
     "32o": 0.18,
-}
+})
+
+# Hand strength indexed by canonical hand id
+HAND_STRENGTHS: tuple[float, ...] = tuple(HAND_RANKINGS[h] for h in CANONICAL_HANDS)
+
+
+@lru_cache(maxsize=256)
+def _hand_strength(hand: str) -> float:
+    """Cached hand strength lookup keyed on hand notation."""
+    idx = hand_id(hand)
+    if idx is None:
+        return 0.3
+    return HAND_STRENGTHS[idx]
+
+
+def _hand_combos(hand: str) -> int:
+    """Number of card combinations for a hand class."""
+    if len(hand) == 2:  # Pair
+        return 6
+    elif hand.endswith('s'):  # Suited
+        return 4
+    elif hand.endswith('o'):  # Offsuit
+        return 12
+    return 0
+
+
+# Combo count for every canonical hand
+_COMBOS: dict[str, int] = {hand: _hand_combos(hand) for hand in CANONICAL_HANDS}
+
+
+@lru_cache(maxsize=128)
+def _range_percentage(range_set: frozenset[str]) -> float:
+    """Cached combo percentage of a range (chart ranges are frozensets)."""
+    if not range_set:
+        return 0.0
+    
+    if "any" in range_set:
+        return 100.0
+    
+    # Total possible starting hands: 169 unique combinations
+    # But actual combos: 1326
+    # Pairs: 13 * 6 = 78
+    # Suited: 78 * 4 = 312  
+    # Offsuit: 78 * 12 = 936
+    
+    total_combos = 1326
+    range_combos = sum(
+        _COMBOS.get(hand) or _hand_combos(hand) for hand in range_set
+    )
+    
+    return (range_combos / total_combos) * 100
 
 
 class PushFoldCalculator:
@@ -105,33 +158,11 @@ class PushFoldCalculator:
     
     def get_hand_strength(self, hand: str) -> float:
         """Get normalized hand strength (0-1)."""
-        if hand in HAND_RANKINGS:
-            return HAND_RANKINGS[hand]
-        
-        # Try to normalize hand notation
-        normalized = self._normalize_hand(hand)
-        return HAND_RANKINGS.get(normalized, 0.3)
+        return _hand_strength(hand)
     
     def _normalize_hand(self, hand: str) -> str:
         """Normalize hand notation (e.g., 'KAs' -> 'AKs')."""
-        if len(hand) < 2:
-            return hand
-        
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-        rank_order = {r: i for i, r in enumerate(ranks)}
-        
-        r1, r2 = hand[0].upper(), hand[1].upper()
-        suffix = hand[2:].lower() if len(hand) > 2 else ""
-        
-        # Sort ranks (higher first)
-        if rank_order.get(r1, 0) < rank_order.get(r2, 0):
-            r1, r2 = r2, r1
-        
-        # Pairs don't have suffix
-        if r1 == r2:
-            return f"{r1}{r2}"
-        
-        return f"{r1}{r2}{suffix}"
+        return normalize_hand(hand)
     
     def should_push(
         self,
@@ -235,7 +266,7 @@ class PushFoldCalculator:
             in_range=in_range,
         )
     
-    def get_push_range(self, position: str, stack_bb: float) -> list[str]:
+    def get_push_range(self, position: str, stack_bb: float) -> frozenset[str]:
         """Get all hands that should be pushed from this position/stack."""
         return get_push_fold_range(
             position=position,
@@ -248,7 +279,7 @@ class PushFoldCalculator:
         position: str, 
         stack_bb: float, 
         vs_position: str = "SB"
-    ) -> list[str]:
+    ) -> frozenset[str]:
         """Get all hands that should call an all-in."""
         return get_call_range(
             position=position,
@@ -257,29 +288,6 @@ class PushFoldCalculator:
             vs_position=vs_position
         )
     
-    def get_range_percentage(self, range_list: list[str]) -> float:
+    def get_range_percentage(self, range_list: Collection[str]) -> float:
         """Calculate what percentage of hands a range represents."""
-        if not range_list:
-            return 0.0
-        
-        if "any" in range_list:
-            return 100.0
-        
-        # Total possible starting hands: 169 unique combinations
-        # But actual combos: 1326
-        # Pairs: 13 * 6 = 78
-        # Suited: 78 * 4 = 312  
-        # Offsuit: 78 * 12 = 936
-        
-        total_combos = 1326
-        range_combos = 0
-        
-        for hand in range_list:
-            if len(hand) == 2:  # Pair
-                range_combos += 6
-            elif hand.endswith('s'):  # Suited
-                range_combos += 4
-            elif hand.endswith('o'):  # Offsuit
-                range_combos += 12
-        
-        return (range_combos / total_combos) * 100
+        return _range_percentage(frozenset(range_list))
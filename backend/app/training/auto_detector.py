@@ -10,11 +10,127 @@ import numpy as np
 from typing import Optional
 from pathlib import Path
 from dataclasses import dataclass, field
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import base64
+import importlib.util
 import json
+import os
+import threading
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-@dataclass
+
+# Structuring element for cleaning up the white-card mask
+_MORPH_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+
+# Run the heuristic pixel pipeline through OpenCL (cv2.UMat) when a
+# device is available
+HAS_OPENCL = cv2.ocl.haveOpenCL()
+
+# Max batch size of exported TensorRT/OpenVINO models (exported with dynamic shapes)
+_EXPORT_BATCH = 8
+
+
+def _cuda_available() -> bool:
+    """Check for a CUDA device (torch comes with ultralytics)."""
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+def _exported_batch_size(model_path: str) -> Optional[int]:
+    """
+    Max batch size an exported model accepts, from its Ultralytics metadata.
+    
+    Returns None for .pt weights (any batch size) and 1 when the metadata
+    can't be read, which is safe for static exports.
+    """
+    path = Path(model_path)
+    if path.suffix == ".pt":
+        return None
+    
+    try:
+        if path.suffix == ".engine":
+            # TensorRT engines start with a length-prefixed JSON header
+            with open(path, "rb") as f:
+                meta_len = int.from_bytes(f.read(4), byteorder="little")
+                metadata = json.loads(f.read(meta_len))
+        else:
+            from ultralytics.utils import yaml_load
+            metadata = yaml_load(path / "metadata.yaml")
+        return max(1, int(metadata["batch"]))
+    except Exception:
+        return 1
+
+
+def _region_boxes(regions: list["DetectedRegion"]) -> np.ndarray:
+    """Stack regions into an (N, 4) array of (x, y, width, height)."""
+    return np.array(
+        [(r.x, r.y, r.width, r.height) for r in regions], dtype=np.int64
+    ).reshape(-1, 4)
+
+
+def _iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU of every (x, y, w, h) box in a (N, 4) against b (M, 4), as (N, M)."""
+    ax1, ay1 = a[:, 0:1], a[:, 1:2]
+    ax2, ay2 = ax1 + a[:, 2:3], ay1 + a[:, 3:4]
+    bx1, by1 = b[:, 0], b[:, 1]
+    bx2, by2 = bx1 + b[:, 2], by1 + b[:, 3]
+    
+    inter_w = np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0, None)
+    inter_h = np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0, None)
+    intersection = inter_w * inter_h
+    
+    union = (a[:, 2] * a[:, 3])[:, None] + b[:, 2] * b[:, 3] - intersection
+    return np.divide(
+        intersection, union, out=np.zeros(intersection.shape), where=union > 0
+    )
+
+
+def _candidate_regions(candidates: np.ndarray) -> list["DetectedRegion"]:
+    """Materialize (x, y, w, h, confidence) candidate rows as card regions."""
+    return [
+        DetectedRegion(
+            x=int(x), y=int(y), width=int(w), height=int(h),
+            confidence=conf, region_type="card",
+        )
+        for x, y, w, h, conf in candidates.tolist()
+    ]
+
+
+# Downscale factor of cv2.IMREAD_REDUCED_COLOR_2 decodes
+_REDUCED_DECODE_SCALE = 2
+
+
+@lru_cache(maxsize=4)
+def _decode_image(image_data: str, reduced: bool = False) -> Optional[np.ndarray]:
+    """
+    Decode a base64 encoded image to a BGR array.
+    
+    With `reduced`, decodes at half resolution (libjpeg skips most of the
+    IDCT work for JPEG input).
+    
+    Cached so detecting and then cropping the same screenshot decodes it
+    once. The returned array is shared and marked read-only.
+    """
+    img_bytes = base64.b64decode(image_data)
+    nparr = np.frombuffer(img_bytes, np.uint8)
+    flags = cv2.IMREAD_REDUCED_COLOR_2 if reduced else cv2.IMREAD_COLOR
+    img = cv2.imdecode(nparr, flags)
+    
+    if img is not None:
+        img.flags.writeable = False
+    return img
+
+
+@dataclass(slots=True)
 class DetectedRegion:
     """A detected card region."""
     x: int  # Top-left x (pixels)
@@ -48,7 +164,7 @@ class DetectedRegion:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CardPosition:
     """Configuration for a card position on the table."""
     x: float  # Normalized x (0-1)
@@ -219,16 +335,43 @@ class CardAutoDetector:
     # Brightness threshold for card presence
     CARD_BRIGHTNESS_THRESHOLD = 100
     
+    # Heuristic detection runs at 1/HEURISTIC_DOWNSCALE resolution on
+    # screenshots whose shorter side is at least HEURISTIC_MIN_SIDE pixels
+    HEURISTIC_DOWNSCALE = 2
+    HEURISTIC_MIN_SIDE = 480
+    
+    # Skip heuristics when the model finds every layout card at least
+    # this confidently
+    COMPLETE_DETECTION_CONFIDENCE = 0.5
+    
     def __init__(
         self,
         model_path: Optional[str] = None,
         layout: Optional[PokerOKLayout] = None,
         config_path: str = "data/detector_config.json",
+        optimize_model: bool = True,
     ):
         self.model = None
         self.model_path = model_path
         self.config_path = Path(config_path)
         
+        # Export .pt weights to TensorRT/OpenVINO when the runtime is installed
+        self.optimize_model = optimize_model
+        self.half = False
+        
+        # Images per model call; exported models have a fixed max batch
+        self.model_batch: Optional[int] = None
+        
+        # Background TensorRT/OpenVINO export of the loaded .pt weights
+        self._export_thread: Optional[threading.Thread] = None
+        self._source_model_path: Optional[str] = None
+        
+        # Worker threads for CPU work that overlaps model inference
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # Pixel boxes of layout positions per image size
+        self._box_cache: dict[tuple[int, int], tuple] = {}
+        
         # Load or use default layout
         self.layout = layout or self._load_layout()
         
@@ -239,9 +382,10 @@ class CardAutoDetector:
         """Load layout from config file or use default."""
         if self.config_path.exists():
             try:
-                with open(self.config_path, 'r') as f:
-                    data = json.load(f)
-                    return PokerOKLayout.from_dict(data.get("layout", {}))
+                with open(self.config_path, 'rb') as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+                return PokerOKLayout.from_dict(data.get("layout", {}))
             except Exception as e:
                 print(f"Failed to load layout config: {e}")
         
@@ -252,18 +396,25 @@ class CardAutoDetector:
         layout = layout or self.layout
         self.config_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(self.config_path, 'w') as f:
-            json.dump({"layout": layout.to_dict()}, f, indent=2)
+        data = {"layout": layout.to_dict()}
+        if HAS_ORJSON:
+            with open(self.config_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(self.config_path, 'w') as f:
+                json.dump(data, f, indent=2)
     
     def set_layout(self, layout: PokerOKLayout):
         """Set and save new layout."""
         self.layout = layout
+        self._box_cache.clear()
         self.save_layout()
     
     def set_preset(self, preset_name: str):
         """Set layout from preset."""
         if preset_name in POKEROK_PRESETS:
             self.layout = POKEROK_PRESETS[preset_name]
+            self._box_cache.clear()
             self.save_layout()
             return True
         return False
@@ -273,15 +424,126 @@ class CardAutoDetector:
         return list(POKEROK_PRESETS.keys())
     
     def _load_model(self, model_path: str):
-        """Load YOLO model for detection."""
+        """
+        Load YOLO model for detection.
+        
+        Uses an up-to-date TensorRT/OpenVINO export of .pt weights if one
+        exists; otherwise loads the .pt right away and exports in the
+        background, switching to the export once it is ready.
+        """
+        self._source_model_path = model_path
         try:
             from ultralytics import YOLO
-            self.model = YOLO(model_path)
+            if self.optimize_model and model_path.endswith(".pt"):
+                optimized_path = self._find_optimized_model(model_path)
+                if optimized_path is not None:
+                    model_path = optimized_path
+                else:
+                    self._start_export(model_path)
+            self.model_batch = _exported_batch_size(model_path)
+            self.model = YOLO(model_path, task="detect")
+            
+            # FP16 inference on GPU (ignored by ultralytics on CPU)
+            self.half = _cuda_available()
             print(f"Loaded detection model from {model_path}")
         except Exception as e:
             print(f"Failed to load model: {e}")
             self.model = None
     
+    def _export_spec(self, model_path: str) -> tuple[str, str, Path, dict]:
+        """
+        Runtime, export format, output path and export args for a .pt model.
+        
+        Uses a TensorRT FP16 engine on CUDA hosts and OpenVINO on CPU.
+        """
+        pt_path = Path(model_path)
+        
+        if _cuda_available():
+            runtime, export_format = "tensorrt", "engine"
+            optimized_path = pt_path.with_suffix(".engine")
+            export_args = {"half": True, "device": 0}
+        else:
+            runtime, export_format = "openvino", "openvino"
+            optimized_path = pt_path.with_name(f"{pt_path.stem}_openvino_model")
+            export_args = {}
+        
+        # Dynamic batch so detect_regions_batch can send several images
+        export_args.update(dynamic=True, batch=_EXPORT_BATCH)
+        return runtime, export_format, optimized_path, export_args
+    
+    def _find_optimized_model(self, model_path: str) -> Optional[str]:
+        """Path of an export of a .pt model that is newer than the weights, if any."""
+        _, _, optimized_path, _ = self._export_spec(model_path)
+        try:
+            if optimized_path.stat().st_mtime >= Path(model_path).stat().st_mtime:
+                return str(optimized_path)
+        except FileNotFoundError:
+            pass
+        return None
+    
+    def _start_export(self, model_path: str):
+        """Export a .pt model on a background thread and load it when done."""
+        if self._export_thread is not None and self._export_thread.is_alive():
+            return
+        
+        # Don't let the exporter pull in a missing runtime
+        runtime = self._export_spec(model_path)[0]
+        if importlib.util.find_spec(runtime) is None:
+            return
+        
+        def export():
+            exported_path = self.export_optimized_model(model_path)
+            
+            # Skip if another model was loaded while exporting
+            if exported_path != model_path and self._source_model_path == model_path:
+                from ultralytics import YOLO
+                try:
+                    model = YOLO(exported_path, task="detect")
+                except Exception as e:
+                    print(f"Failed to load exported model: {e}")
+                    return
+                # Lower the batch limit before the engine becomes visible
+                self.model_batch = _exported_batch_size(exported_path)
+                self.model = model
+                print(f"Switched detection model to {exported_path}")
+        
+        self._export_thread = threading.Thread(target=export, daemon=True)
+        self._export_thread.start()
+    
+    def export_optimized_model(self, model_path: str) -> str:
+        """
+        Export a .pt model to TensorRT/OpenVINO (slow; minutes).
+        
+        The export is cached next to the weights and redone when the .pt
+        file is newer. Returns the .pt path if the runtime is not
+        installed or the export fails.
+        """
+        optimized = self._find_optimized_model(model_path)
+        if optimized is not None:
+            return optimized
+        
+        runtime, export_format, _, export_args = self._export_spec(model_path)
+        if importlib.util.find_spec(runtime) is None:
+            return model_path
+        
+        try:
+            from ultralytics import YOLO
+            exported_path = YOLO(model_path).export(format=export_format, **export_args)
+            print(f"Exported {export_format} model to {exported_path}")
+            return str(exported_path)
+        except Exception as e:
+            print(f"Model export failed, using {model_path}: {e}")
+            return model_path
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the worker thread pool, creating it on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                thread_name_prefix="card-detect",
+            )
+        return self._executor
+    
     def reload_model(self, model_path: str):
         """Reload model from new path."""
         self._load_model(model_path)
@@ -305,213 +567,389 @@ class CardAutoDetector:
         Returns:
             List of detected regions
         """
-        # Decode image
-        img_bytes = base64.b64decode(image_data)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        return self.detect_regions_batch(
+            [image_data],
+            use_model=use_model,
+            use_heuristics=use_heuristics,
+            use_positions=use_positions,
+        )[0]
+    
+    def detect_regions_batch(
+        self,
+        image_datas: list[str],  # Base64 encoded
+        use_model: bool = True,
+        use_heuristics: bool = True,
+        use_positions: bool = True,
+    ) -> list[list[dict]]:
+        """
+        Detect card regions in several images.
         
-        if img is None:
-            return []
+        All decoded images go through the model in a single batched call.
         
-        height, width = img.shape[:2]
-        regions = []
+        Returns:
+            List of detected regions per image (empty for undecodable images)
+        """
+        all_regions: list[list[dict]] = [[] for _ in image_datas]
         
-        # Use trained model if available (highest priority)
-        if use_model and self.model is not None:
-            model_regions = self._detect_with_model(img)
-            regions.extend(model_regions)
+        executor = self._get_executor()
         
-        # Use configured positions (medium priority)
-        if use_positions and not regions:
-            position_regions = self._detect_at_positions(img)
-            regions.extend(position_regions)
+        # Without the model only the CPU paths run, and those work on a
+        # half-resolution decode
+        reduced = not (use_model and self.model is not None)
         
-        # Use heuristic detection (lowest priority, fills gaps)
+        # Grayscale is shared by the position and heuristic detectors
+        need_gray = use_positions or use_heuristics
+        
+        # Decode images on worker threads (imdecode releases the GIL),
+        # keeping track of which ones are valid
+        decoded = [
+            (i, img, gray, scale)
+            for i, (img, gray, scale) in enumerate(executor.map(
+                lambda image_data: self._prepare_image(image_data, reduced, need_gray),
+                image_datas,
+            ))
+            if img is not None
+        ]
+        
+        if not decoded:
+            return all_regions
+        
+        # Heuristic detection doesn't depend on model output, so run it on
+        # worker threads while the model is busy
+        heuristic_jobs = []
         if use_heuristics:
-            heuristic_regions = self._detect_with_heuristics(img)
+            heuristic_jobs = [
+                executor.submit(self._detect_with_heuristics, gray, scale == 1)
+                for _, _, gray, scale in decoded
+            ]
+        
+        # Use trained model if available (highest priority)
+        if use_model and self.model is not None:
+            model_regions = self._detect_with_model_batch([img for _, img, _, _ in decoded])
+        else:
+            model_regions = [[] for _ in decoded]
+        
+        # No gaps to fill where the model confidently found every card;
+        # drop those heuristic jobs if they haven't started yet
+        complete = [self._is_complete_detection(regions) for regions in model_regions]
+        for job, done in zip(heuristic_jobs, complete):
+            if done:
+                job.cancel()
+        
+        for k, ((i, img, gray, scale), regions) in enumerate(zip(decoded, model_regions)):
+            height, width = img.shape[:2]
+            
+            # Use configured positions (medium priority)
+            if use_positions and not regions:
+                position_regions = self._detect_at_positions(gray)
+                regions.extend(position_regions)
             
-            # Filter out duplicates (regions that overlap with existing)
-            for hr in heuristic_regions:
-                if not self._overlaps_existing(hr, regions):
-                    regions.append(hr)
+            # Use heuristic detection (lowest priority, fills gaps)
+            if use_heuristics and not complete[k]:
+                candidates = heuristic_jobs[k].result()
+                
+                # Filter out duplicates (regions that overlap with existing)
+                kept = self._filter_overlapping(candidates, regions)
+                regions.extend(_candidate_regions(kept))
+            
+            # Map reduced-decode regions back to full-resolution pixels
+            if scale > 1:
+                height, width = height * scale, width * scale
+                for r in regions:
+                    r.x, r.y = r.x * scale, r.y * scale
+                    r.width, r.height = r.width * scale, r.height * scale
+            
+            # Convert to normalized format
+            all_regions[i] = [r.to_normalized(width, height) for r in regions]
+        
+        return all_regions
+    
+    def _prepare_image(
+        self,
+        image_data: str,
+        reduced: bool,
+        grayscale: bool,
+    ) -> tuple[Optional[np.ndarray], Optional[np.ndarray], int]:
+        """
+        Decode an image for detection, at half resolution if `reduced`.
+        
+        Reduced decodes of small screenshots fall back to full resolution,
+        matching where heuristic detection would not downscale on its own.
+        
+        Returns:
+            (BGR image, its grayscale conversion if `grayscale`, downscale factor)
+        """
+        img, scale = None, 1
+        if reduced:
+            img = _decode_image(image_data, reduced=True)
+            if (
+                img is not None
+                and min(img.shape[:2]) * _REDUCED_DECODE_SCALE >= self.HEURISTIC_MIN_SIDE
+            ):
+                scale = _REDUCED_DECODE_SCALE
+            else:
+                img = None
+        
+        if img is None:
+            img = _decode_image(image_data)
+        
+        gray = None
+        if img is not None and grayscale:
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         
-        # Convert to normalized format
-        return [r.to_normalized(width, height) for r in regions]
+        return img, gray, scale
+    
+    def _is_complete_detection(self, regions: list[DetectedRegion]) -> bool:
+        """Check if regions cover every layout card with enough confidence."""
+        expected = len(self.layout.hero_cards) + len(self.layout.board_cards)
+        return (
+            bool(regions)
+            and len(regions) >= expected
+            and min(r.confidence for r in regions) >= self.COMPLETE_DETECTION_CONFIDENCE
+        )
     
     def _detect_with_model(self, img: np.ndarray) -> list[DetectedRegion]:
         """Detect cards using trained YOLO model."""
+        return self._detect_with_model_batch([img])[0]
+    
+    def _detect_with_model_batch(
+        self,
+        imgs: list[np.ndarray],
+    ) -> list[list[DetectedRegion]]:
+        """Detect cards in several images, as few YOLO calls as the model allows."""
+        step = self.model_batch or max(1, len(imgs))
+        results = []
+        for start in range(0, len(imgs), step):
+            results.extend(self.model(imgs[start:start + step], verbose=False, half=self.half))
+        
+        return [self._regions_from_result(result) for result in results]
+    
+    def _regions_from_result(self, result) -> list[DetectedRegion]:
+        """Convert a YOLO result into detected regions."""
         regions = []
         
-        results = self.model(img, verbose=False)
+        boxes = result.boxes
+        if boxes is None:
+            return regions
         
-        for result in results:
-            boxes = result.boxes
-            if boxes is None:
-                continue
+        for box in boxes:
+            cls = int(box.cls[0])
+            conf = float(box.conf[0])
+            x1, y1, x2, y2 = box.xyxy[0].tolist()
             
-            for box in boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                
-                # Get class name
-                class_name = result.names.get(cls, "")
-                
-                regions.append(DetectedRegion(
-                    x=int(x1),
-                    y=int(y1),
-                    width=int(x2 - x1),
-                    height=int(y2 - y1),
-                    confidence=conf,
-                    suggested_class=class_name,
-                    region_type="card",
-                ))
+            # Get class name
+            class_name = result.names.get(cls, "")
+            
+            regions.append(DetectedRegion(
+                x=int(x1),
+                y=int(y1),
+                width=int(x2 - x1),
+                height=int(y2 - y1),
+                confidence=conf,
+                suggested_class=class_name,
+                region_type="card",
+            ))
         
         return regions
     
-    def _detect_at_positions(self, img: np.ndarray) -> list[DetectedRegion]:
-        """Detect cards at configured positions."""
-        height, width = img.shape[:2]
+    def _detect_at_positions(self, gray: np.ndarray) -> list[DetectedRegion]:
+        """Detect cards at configured positions in a grayscale image."""
+        height, width = gray.shape[:2]
         regions = []
         
-        # Check hero card positions
-        for pos in self.layout.hero_cards:
-            region = self._check_position(img, pos, width, height)
-            if region:
-                regions.append(region)
+        positions, corners = self._position_boxes(width, height)
+        if not positions:
+            return regions
+        
+        # Integral images give every position's mean/std from four lookups
+        sums, sq_sums = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
         
-        # Check board card positions
-        for pos in self.layout.board_cards:
-            region = self._check_position(img, pos, width, height)
-            if region:
-                regions.append(region)
+        x1, y1, x2, y2 = corners.T
+        area = (x2 - x1) * (y2 - y1)
+        roi_sum = sums[y2, x2] - sums[y1, x2] - sums[y2, x1] + sums[y1, x1]
+        roi_sq_sum = sq_sums[y2, x2] - sq_sums[y1, x2] - sq_sums[y2, x1] + sq_sums[y1, x1]
+        
+        # Check if there's a card (based on brightness and variance)
+        mean_brightness = roi_sum / area
+        std_brightness = np.sqrt(np.maximum(roi_sq_sum / area - mean_brightness ** 2, 0.0))
+        
+        for (pos, x, y, w, h), mean, std in zip(
+            positions, mean_brightness.tolist(), std_brightness.tolist()
+        ):
+            # Cards have white background with dark symbols = high mean, high std
+            if mean > self.CARD_BRIGHTNESS_THRESHOLD and std > 30:
+                confidence = min((mean - 100) / 100, 0.9)  # Higher brightness = higher confidence
+                
+                regions.append(DetectedRegion(
+                    x=x,
+                    y=y,
+                    width=w,
+                    height=h,
+                    confidence=confidence,
+                    region_type=pos.region_type,
+                    position_index=pos.index,
+                ))
         
         return regions
     
-    def _check_position(
+    def _position_boxes(
         self,
-        img: np.ndarray,
-        pos: CardPosition,
         img_width: int,
         img_height: int,
-    ) -> Optional[DetectedRegion]:
-        """Check if there's a card at the given position."""
-        x = int(pos.x * img_width)
-        y = int(pos.y * img_height)
-        w = int(pos.width * img_width)
-        h = int(pos.height * img_height)
-        
-        # Ensure within bounds
-        x = max(0, min(x, img_width - w))
-        y = max(0, min(y, img_height - h))
-        
-        # Extract ROI
-        roi = img[y:y+h, x:x+w]
-        if roi.size == 0:
-            return None
+    ) -> tuple[list[tuple[CardPosition, int, int, int, int]], np.ndarray]:
+        """
+        Get pixel boxes of the layout's hero and board positions.
         
-        # Check if there's a card (based on brightness and variance)
-        gray_roi = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        mean_brightness = np.mean(gray_roi)
-        std_brightness = np.std(gray_roi)
+        Cached per image size until the layout changes.
         
-        # Cards have white background with dark symbols = high mean, high std
-        if mean_brightness > self.CARD_BRIGHTNESS_THRESHOLD and std_brightness > 30:
-            confidence = min((mean_brightness - 100) / 100, 0.9)  # Higher brightness = higher confidence
+        Returns:
+            (position, x, y, w, h) for each usable position, and an (N, 4)
+            array of their (x1, y1, x2, y2) corners clipped to the image
+        """
+        cached = self._box_cache.get((img_width, img_height))
+        if cached is not None:
+            return cached
+        
+        positions = []
+        corners = []
+        for pos in (*self.layout.hero_cards, *self.layout.board_cards):
+            x = int(pos.x * img_width)
+            y = int(pos.y * img_height)
+            w = int(pos.width * img_width)
+            h = int(pos.height * img_height)
             
-            return DetectedRegion(
-                x=x,
-                y=y,
-                width=w,
-                height=h,
-                confidence=confidence,
-                region_type=pos.region_type,
-                position_index=pos.index,
-            )
+            # Ensure within bounds
+            x = max(0, min(x, img_width - w))
+            y = max(0, min(y, img_height - h))
+            
+            # ROI corners, clipped to the image
+            x2 = min(x + w, img_width)
+            y2 = min(y + h, img_height)
+            if w <= 0 or h <= 0 or (x2 - x) * (y2 - y) <= 0:
+                continue
+            
+            positions.append((pos, x, y, w, h))
+            corners.append((x, y, x2, y2))
         
-        return None
+        result = (positions, np.array(corners, dtype=np.int64).reshape(-1, 4))
+        self._box_cache[(img_width, img_height)] = result
+        return result
     
-    def _detect_with_heuristics(self, img: np.ndarray) -> list[DetectedRegion]:
-        """Detect card regions using color and contour analysis."""
-        height, width = img.shape[:2]
-        regions = []
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Find white regions (card faces are typically white)
-        _, white_mask = cv2.threshold(gray, self.WHITE_THRESHOLD, 255, cv2.THRESH_BINARY)
+    def _detect_with_heuristics(
+        self,
+        gray: np.ndarray,
+        downscale: bool = True,
+    ) -> np.ndarray:
+        """
+        Detect card regions using color and contour analysis.
         
-        # Morphological operations to clean up
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-        white_mask = cv2.morphologyEx(white_mask, cv2.MORPH_CLOSE, kernel)
-        white_mask = cv2.morphologyEx(white_mask, cv2.MORPH_OPEN, kernel)
+        Args:
+            gray: Grayscale image (not modified)
+            downscale: Search a downscaled copy of large images (disable
+                for images that were already decoded at reduced size)
+            
+        Returns:
+            (K, 5) array of candidate (x, y, width, height, confidence) rows
+        """
+        height, width = gray.shape[:2]
+        candidates = np.empty((0, 5))
+        
+        # Search a downscaled copy; card size limits are relative to the
+        # image, boxes are scaled back to full resolution below
+        scale = 1
+        src = cv2.UMat(gray) if HAS_OPENCL else gray
+        if downscale and min(height, width) >= self.HEURISTIC_MIN_SIDE:
+            scale = self.HEURISTIC_DOWNSCALE
+            height, width = height // scale, width // scale
+            src = cv2.resize(src, (width, height), interpolation=cv2.INTER_AREA)
+        
+        # Find white regions (card faces are typically white); the caller's
+        # grayscale is shared, so only a private resized copy is reused
+        _, white_mask = cv2.threshold(
+            src, self.WHITE_THRESHOLD, 255, cv2.THRESH_BINARY,
+            dst=src if scale > 1 else None,
+        )
+        
+        # Morphological operations to clean up, reusing the mask buffer
+        cv2.morphologyEx(white_mask, cv2.MORPH_CLOSE, _MORPH_KERNEL, dst=white_mask)
+        cv2.morphologyEx(white_mask, cv2.MORPH_OPEN, _MORPH_KERNEL, dst=white_mask)
+        
+        # findContours is CPU-only, download the mask from the device
+        if HAS_OPENCL:
+            white_mask = white_mask.get()
         
         # Find contours
         contours, _ = cv2.findContours(white_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
-        for contour in contours:
-            # Get bounding rectangle
-            x, y, w, h = cv2.boundingRect(contour)
-            
-            # Check size constraints
-            rel_w = w / width
-            rel_h = h / height
-            
-            if rel_w < self.MIN_CARD_SIZE or rel_h < self.MIN_CARD_SIZE:
-                continue
-            if rel_w > self.MAX_CARD_SIZE or rel_h > self.MAX_CARD_SIZE:
-                continue
-            
-            # Check aspect ratio
-            aspect = w / h if h > 0 else 0
-            if abs(aspect - self.CARD_ASPECT_RATIO) > self.ASPECT_TOLERANCE:
-                continue
-            
-            # Calculate confidence based on shape and color
-            area_ratio = cv2.contourArea(contour) / (w * h) if w * h > 0 else 0
-            confidence = area_ratio * 0.8  # Rectangular shapes score higher
-            
-            regions.append(DetectedRegion(
-                x=x,
-                y=y,
-                width=w,
-                height=h,
-                confidence=confidence,
-                region_type="card",
-            ))
+        if not contours:
+            return candidates
         
-        return regions
+        # Bounding rectangles of all contours as an (N, 4) array
+        boxes = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int64)
+        box_w = boxes[:, 2]
+        box_h = boxes[:, 3]
+        
+        # Check size constraints
+        rel_w = box_w / width
+        rel_h = box_h / height
+        keep = (
+            (rel_w >= self.MIN_CARD_SIZE) & (rel_h >= self.MIN_CARD_SIZE)
+            & (rel_w <= self.MAX_CARD_SIZE) & (rel_h <= self.MAX_CARD_SIZE)
+        )
+        
+        # Check aspect ratio
+        aspect = np.divide(box_w, box_h, out=np.zeros(len(boxes)), where=box_h > 0)
+        keep &= np.abs(aspect - self.CARD_ASPECT_RATIO) <= self.ASPECT_TOLERANCE
+        
+        indices = np.flatnonzero(keep)
+        candidates = np.empty((len(indices), 5))
+        candidates[:, :4] = boxes[indices] * scale
+        
+        # Calculate confidence based on shape and color; size limits
+        # guarantee a non-empty box. Rectangular shapes score higher.
+        areas = np.array([cv2.contourArea(contours[i]) for i in indices.tolist()])
+        box_areas = box_w[indices] * box_h[indices]
+        candidates[:, 4] = areas / box_areas * 0.8
+        
+        return candidates
     
-    def _overlaps_existing(
+    def _filter_overlapping(
         self,
-        new_region: DetectedRegion,
+        candidates: np.ndarray,
         existing: list[DetectedRegion],
         threshold: float = 0.5,
-    ) -> bool:
-        """Check if new region overlaps significantly with existing regions."""
-        for existing_region in existing:
-            iou = self._calculate_iou(new_region, existing_region)
-            if iou > threshold:
-                return True
-        return False
-    
-    def _calculate_iou(self, r1: DetectedRegion, r2: DetectedRegion) -> float:
-        """Calculate Intersection over Union of two regions."""
-        x1 = max(r1.x, r2.x)
-        y1 = max(r1.y, r2.y)
-        x2 = min(r1.x + r1.width, r2.x + r2.width)
-        y2 = min(r1.y + r1.height, r2.y + r2.height)
+    ) -> np.ndarray:
+        """
+        Drop candidates overlapping existing regions or earlier kept candidates.
+        
+        All IoUs are computed up front as matrices; only the greedy
+        acceptance among candidates walks them in order.
+        
+        Args:
+            candidates: (K, 5) array of (x, y, width, height, confidence)
+            existing: Regions already accepted
+            
+        Returns:
+            The surviving candidate rows
+        """
+        if not len(candidates):
+            return candidates
+        
+        cand_boxes = candidates[:, :4]
+        
+        keep = np.ones(len(candidates), dtype=bool)
+        if existing:
+            iou = _iou_matrix(cand_boxes, _region_boxes(existing))
+            keep = ~(iou > threshold).any(axis=1)
         
-        if x2 < x1 or y2 < y1:
-            return 0.0
+        duplicates = _iou_matrix(cand_boxes, cand_boxes) > threshold
         
-        intersection = (x2 - x1) * (y2 - y1)
-        area1 = r1.width * r1.height
-        area2 = r2.width * r2.height
-        union = area1 + area2 - intersection
+        accepted = []
+        for j in np.flatnonzero(keep).tolist():
+            if not duplicates[j, accepted].any():
+                accepted.append(j)
         
-        return intersection / union if union > 0 else 0.0
+        return candidates[accepted]
     
     def extract_region(
         self,
@@ -526,9 +964,7 @@ class CardAutoDetector:
         
         Returns base64 encoded cropped image.
         """
-        img_bytes = base64.b64decode(image_data)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img = _decode_image(image_data)
         
         if img is None:
             return ""
@@ -565,4 +1001,5 @@ class CardAutoDetector:
                 region_type="board", index=index
             )
         
+        self._box_cache.clear()
         self.save_layout()
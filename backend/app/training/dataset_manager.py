@@ -9,18 +9,31 @@ Handles:
 - Export functionality
 """
 
+import io
 import os
 import json
+import atexit
 import shutil
 import hashlib
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 from dataclasses import dataclass, field
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import base64
 
 import cv2
 import numpy as np
+from PIL import Image
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 
 # Card classes (52 cards)
@@ -29,6 +42,43 @@ SUITS = ['c', 'd', 'h', 's']  # clubs, diamonds, hearts, spades
 CARD_CLASSES = [f"{r}{s}" for s in SUITS for r in RANKS]
 CLASS_TO_ID = {card: idx for idx, card in enumerate(CARD_CLASSES)}
 ID_TO_CLASS = {idx: card for card, idx in CLASS_TO_ID.items()}
+_NUM_CLASSES = len(CARD_CLASSES)
+
+# printf-style template, formatted without f-string per-field dispatch
+_YOLO_LINE = "%d %.6f %.6f %.6f %.6f"
+
+# EXIF orientation tag; cv2.imdecode applies it, header parsing doesn't
+_EXIF_ORIENTATION = 0x0112
+
+
+def _jpeg_size(img_bytes: bytes) -> Optional[tuple[int, int]]:
+    """
+    Read (width, height) from JPEG headers without decoding pixels.
+    
+    Returns None for anything that can't be stored as-is: other formats,
+    unreadable headers, or EXIF-rotated images.
+    """
+    try:
+        with Image.open(io.BytesIO(img_bytes)) as im:
+            if im.format != "JPEG" or im.getexif().get(_EXIF_ORIENTATION, 1) != 1:
+                return None
+            return im.size
+    except Exception:
+        return None
+
+
+def _label_filename(filename: str) -> str:
+    """YOLO label file name for an image file name."""
+    return f"{Path(filename).stem}.txt"
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """Hardlink src to dst, copying instead across filesystems or where links aren't supported."""
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
 
 
 @dataclass
@@ -44,7 +94,18 @@ class BoundingBox:
     
     def to_yolo(self) -> str:
         """Convert to YOLO format string."""
-        return f"{self.class_id} {self.x_center:.6f} {self.y_center:.6f} {self.width:.6f} {self.height:.6f}"
+        return _YOLO_LINE % (self.class_id, self.x_center, self.y_center, self.width, self.height)
+    
+    def to_dict(self) -> dict:
+        """Convert to the metadata box format."""
+        return {
+            "class_id": self.class_id,
+            "class_name": self.class_name,
+            "x_center": self.x_center,
+            "y_center": self.y_center,
+            "width": self.width,
+            "height": self.height,
+        }
     
     @classmethod
     def from_yolo(cls, line: str) -> 'BoundingBox':
@@ -69,6 +130,26 @@ class BoundingBox:
         x2 = int(x1 + w)
         y2 = int(y1 + h)
         return (x1, y1, x2, y2)
+    
+    @classmethod
+    def batch_to_pixel(
+        cls,
+        boxes: list['BoundingBox'],
+        img_width: int,
+        img_height: int,
+    ) -> np.ndarray:
+        """Convert many boxes to pixel coordinates as an (N, 4) array of (x1, y1, x2, y2)."""
+        arr = np.array(
+            [(b.x_center, b.y_center, b.width, b.height) for b in boxes],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+        size = np.array([img_width, img_height], dtype=np.float64)
+        
+        # Same truncation as to_pixel
+        wh = arr[:, 2:] * size
+        xy1 = np.trunc(arr[:, :2] * size - wh / 2)
+        xy2 = np.trunc(xy1 + wh)
+        return np.concatenate([xy1, xy2], axis=1).astype(np.int32)
 
 
 @dataclass
@@ -80,24 +161,20 @@ class LabeledImage:
     height: int
     boxes: list[BoundingBox] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.now)
+    label_filename: str = ""
+    
+    def __post_init__(self):
+        if not self.label_filename:
+            self.label_filename = _label_filename(self.filename)
     
     def to_dict(self) -> dict:
         return {
             "image_id": self.image_id,
             "filename": self.filename,
+            "label_filename": self.label_filename,
             "width": self.width,
             "height": self.height,
-            "boxes": [
-                {
-                    "class_id": b.class_id,
-                    "class_name": b.class_name,
-                    "x_center": b.x_center,
-                    "y_center": b.y_center,
-                    "width": b.width,
-                    "height": b.height,
-                }
-                for b in self.boxes
-            ],
+            "boxes": [b.to_dict() for b in self.boxes],
             "created_at": self.created_at.isoformat(),
         }
 
@@ -110,35 +187,31 @@ class DatasetStats:
     cards_count: dict = field(default_factory=dict)  # card_name -> count
     
     def to_dict(self) -> dict:
+        coverage, missing_cards, balanced = self._summarize()
         return {
             "total_images": self.total_images,
             "total_boxes": self.total_boxes,
             "cards_count": self.cards_count,
-            "coverage": self._calculate_coverage(),
-            "missing_cards": self._get_missing_cards(),
-            "balanced": self._is_balanced(),
+            "coverage": coverage,
+            "missing_cards": missing_cards,
+            "balanced": balanced,
         }
     
-    def _calculate_coverage(self) -> float:
-        """Calculate what percentage of cards have at least 1 sample."""
-        if not CARD_CLASSES:
-            return 0.0
-        covered = sum(1 for card in CARD_CLASSES if self.cards_count.get(card, 0) > 0)
-        return (covered / len(CARD_CLASSES)) * 100
-    
-    def _get_missing_cards(self) -> list[str]:
-        """Get list of cards with no samples."""
-        return [card for card in CARD_CLASSES if self.cards_count.get(card, 0) == 0]
-    
-    def _is_balanced(self, threshold: float = 0.5) -> bool:
-        """Check if dataset is balanced (no card has less than threshold * avg)."""
-        if not self.cards_count:
-            return False
-        counts = list(self.cards_count.values())
-        if not counts:
-            return False
-        avg = sum(counts) / len(counts)
-        return all(c >= avg * threshold for c in counts)
+    def _summarize(self, threshold: float = 0.5) -> tuple[float, list[str], bool]:
+        """
+        Summarize card coverage in one pass.
+        
+        Returns:
+            (percentage of cards with at least 1 sample, cards with no samples,
+            whether no card has less than threshold * avg samples)
+        """
+        missing = [card for card in CARD_CLASSES if not self.cards_count.get(card, 0)]
+        coverage = (_NUM_CLASSES - len(missing)) / _NUM_CLASSES * 100 if _NUM_CLASSES else 0.0
+        
+        counts = self.cards_count.values()
+        balanced = bool(counts) and min(counts) >= sum(counts) / len(counts) * threshold
+        
+        return coverage, missing, balanced
 
 
 class DatasetManager:
@@ -146,25 +219,42 @@ class DatasetManager:
     Manages the training dataset for card detection.
     """
     
-    def __init__(self, base_path: str = "data/training_dataset"):
+    def __init__(
+        self,
+        base_path: str = "data/training_dataset",
+        flush_interval: float = 5.0,
+    ):
         self.base_path = Path(base_path)
         self.images_path = self.base_path / "images"
         self.labels_path = self.base_path / "labels"
         self.metadata_path = self.base_path / "metadata.json"
+        # Append-only log of changes not yet flushed to metadata.json
+        self.journal_path = self.base_path / "labels.jsonl"
         
         # Create directories
         self.images_path.mkdir(parents=True, exist_ok=True)
         self.labels_path.mkdir(parents=True, exist_ok=True)
         
-        # Load metadata
+        # metadata.json is rewritten at most once per flush interval
+        self._flush_interval = flush_interval
+        self._flush_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        
+        # Load metadata, recovering changes journaled before a crash
         self.metadata: dict = self._load_metadata()
+        self._replay_journal()
+        self._migrate_label_filenames()
+        self._migrate_flat_layout()
         self.stats = self._calculate_stats()
+        
+        atexit.register(self._flush_metadata)
     
     def _load_metadata(self) -> dict:
         """Load dataset metadata from file."""
         if self.metadata_path.exists():
-            with open(self.metadata_path, "r") as f:
-                return json.load(f)
+            raw = self.metadata_path.read_bytes()
+            return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
         return {
             "images": {},
             "created_at": datetime.now().isoformat(),
@@ -172,65 +262,214 @@ class DatasetManager:
         }
     
     def _save_metadata(self):
-        """Save metadata to file."""
+        """Save metadata to file (compact; pipe through `python -m json.tool` to read)."""
         self.metadata["updated_at"] = datetime.now().isoformat()
-        with open(self.metadata_path, "w") as f:
-            json.dump(self.metadata, f, indent=2)
+        if HAS_ORJSON:
+            self.metadata_path.write_bytes(orjson.dumps(self.metadata))
+        else:
+            with open(self.metadata_path, "w") as f:
+                json.dump(self.metadata, f)
     
-    def _calculate_stats(self) -> DatasetStats:
-        """Calculate dataset statistics."""
-        stats = DatasetStats()
-        stats.cards_count = {card: 0 for card in CARD_CLASSES}
+    def _replay_journal(self):
+        """Apply journaled changes newer than the saved metadata."""
+        if not self.journal_path.exists():
+            return
+        
+        saved_at = self.metadata.get("updated_at", "")
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    record = orjson.loads(line) if HAS_ORJSON else json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Torn final write
+                if record.get("at", "") > saved_at:
+                    self._apply_record(record)
+                    self._dirty = True
+        
+        if self._dirty:
+            self._flush_metadata()
+    
+    def _migrate_label_filenames(self):
+        """Fill in label file names for images saved before they were stored."""
+        for image_data in self.metadata["images"].values():
+            if "label_filename" not in image_data:
+                image_data["label_filename"] = _label_filename(image_data["filename"])
+    
+    def _image_path(self, image_id: str, filename: str) -> Path:
+        """Image file location, sharded by the first two hex chars of its ID."""
+        return self.images_path / image_id[:2] / filename
+    
+    def _label_path(self, image_id: str, label_filename: str) -> Path:
+        """Label file location, sharded like its image."""
+        return self.labels_path / image_id[:2] / label_filename
+    
+    def _migrate_flat_layout(self):
+        """
+        Move files saved before sharding into their shard directories.
         
-        for image_id, image_data in self.metadata.get("images", {}).items():
-            stats.total_images += 1
-            for box in image_data.get("boxes", []):
-                stats.total_boxes += 1
-                card_name = box.get("class_name", "")
-                if card_name in stats.cards_count:
-                    stats.cards_count[card_name] += 1
+        Flat files not in the metadata are moved to an "unreferenced"
+        directory so the check stops finding them on later startups.
+        """
+        for root, key, shard_path in (
+            (self.images_path, "filename", self._image_path),
+            (self.labels_path, "label_filename", self._label_path),
+        ):
+            with os.scandir(root) as entries:
+                flat_files = [entry.name for entry in entries if entry.is_file()]
+            if not flat_files:
+                continue
+            
+            owners = {
+                image_data[key]: image_id
+                for image_id, image_data in self.metadata["images"].items()
+            }
+            for name in flat_files:
+                image_id = owners.get(name)
+                if image_id is not None:
+                    dst = shard_path(image_id, name)
+                else:
+                    dst = root / "unreferenced" / name
+                dst.parent.mkdir(exist_ok=True)
+                (root / name).replace(dst)
+    
+    def _apply_record(self, record: dict):
+        """Apply a journaled change to the in-memory metadata."""
+        images = self.metadata["images"]
+        op = record["op"]
+        if op == "save":
+            images[record["image"]["image_id"]] = record["image"]
+        elif op == "label":
+            image = images.get(record["image_id"])
+            if image is not None:
+                image["boxes"].append(record["box"])
+        elif op == "delete":
+            images.pop(record["image_id"], None)
+    
+    def _record(self, record: dict):
+        """Apply a change to the metadata and journal it until the next flush."""
+        with self._lock:
+            record["at"] = datetime.now().isoformat()
+            self._apply_record(record)
+            line = orjson.dumps(record) if HAS_ORJSON else json.dumps(record).encode()
+            with open(self.journal_path, "ab") as f:
+                f.write(line + b"\n")
+            self._mark_dirty()
+    
+    def _mark_dirty(self):
+        """Schedule a metadata flush if one isn't pending."""
+        with self._lock:
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self._flush_interval, self._flush_metadata)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def _flush_metadata(self):
+        """Write pending changes to metadata.json and truncate the journal."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            
+            if not self._dirty:
+                return
+            
+            self._save_metadata()
+            self.journal_path.write_text("")
+            self._dirty = False
+    
+    def _calculate_stats(self) -> DatasetStats:
+        """Calculate dataset statistics from metadata (mutations update them incrementally)."""
+        images = self.metadata.get("images", {})
+        
+        # Class names are derived from class ids, so tally the ids in numpy
+        class_ids = np.fromiter(
+            (
+                box.get("class_id", -1)
+                for image_data in images.values()
+                for box in image_data.get("boxes", [])
+            ),
+            dtype=np.int64,
+        )
+        known = class_ids[(class_ids >= 0) & (class_ids < _NUM_CLASSES)]
+        counts = np.bincount(known, minlength=_NUM_CLASSES).tolist()
         
-        return stats
+        return DatasetStats(
+            total_images=len(images),
+            total_boxes=len(class_ids),
+            cards_count=dict(zip(CARD_CLASSES, counts)),
+        )
+    
+    def _stats_add_box(self, class_name: str):
+        """Count a new box in the dataset statistics."""
+        self.stats.total_boxes += 1
+        if class_name in self.stats.cards_count:
+            self.stats.cards_count[class_name] += 1
+    
+    def _stats_remove_box(self, class_name: str):
+        """Remove a deleted box from the dataset statistics."""
+        self.stats.total_boxes -= 1
+        if class_name in self.stats.cards_count:
+            self.stats.cards_count[class_name] -= 1
+    
+    def _stats_remove_image(self, image_data: dict):
+        """Remove a deleted image and its boxes from the dataset statistics."""
+        self.stats.total_images -= 1
+        for box in image_data.get("boxes", []):
+            self._stats_remove_box(box.get("class_name", ""))
     
     def _generate_image_id(self, image_data: bytes) -> str:
-        """Generate unique image ID based on content hash."""
-        return hashlib.md5(image_data).hexdigest()[:12]
+        """Generate unique image ID based on content hash (12 hex chars)."""
+        return hashlib.blake2b(image_data, digest_size=6).hexdigest()
     
     def save_image(
         self,
         image_data: str,  # Base64 encoded
         boxes: list[dict],
         source: str = "browser",
+        validate: bool = False,
     ) -> LabeledImage:
         """
         Save a labeled image to the dataset.
         
+        JPEG uploads are written as-is, with dimensions read from the
+        headers; other formats are decoded and re-encoded as JPEG.
+        
         Args:
             image_data: Base64 encoded JPEG image
             boxes: List of bounding boxes with class_id and coordinates
             source: Source of the image (browser, screenshot, etc.)
+            validate: Fully decode JPEG uploads to reject corrupt data
         
         Returns:
             LabeledImage object
         """
-        # Decode image
         img_bytes = base64.b64decode(image_data)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if img is None:
-            raise ValueError("Failed to decode image")
-        
-        height, width = img.shape[:2]
         
         # Generate image ID
         image_id = self._generate_image_id(img_bytes)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{timestamp}_{image_id}.jpg"
-        
-        # Save image
-        image_path = self.images_path / filename
-        cv2.imwrite(str(image_path), img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        image_path = self._image_path(image_id, filename)
+        image_path.parent.mkdir(exist_ok=True)
+        
+        size = None if validate else _jpeg_size(img_bytes)
+        if size is not None:
+            # Already a JPEG, store the original bytes
+            width, height = size
+            image_path.write_bytes(img_bytes)
+        else:
+            # Decode image
+            nparr = np.frombuffer(img_bytes, np.uint8)
+            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            
+            if img is None:
+                raise ValueError("Failed to decode image")
+            
+            height, width = img.shape[:2]
+            
+            # Save image
+            cv2.imwrite(str(image_path), img, [cv2.IMWRITE_JPEG_QUALITY, 95])
         
         # Create bounding boxes
         bbox_list = []
@@ -246,11 +485,10 @@ class DatasetManager:
             bbox_list.append(bbox)
         
         # Save YOLO label file
-        label_filename = filename.replace(".jpg", ".txt")
-        label_path = self.labels_path / label_filename
-        with open(label_path, "w") as f:
-            for bbox in bbox_list:
-                f.write(bbox.to_yolo() + "\n")
+        label_filename = _label_filename(filename)
+        label_path = self._label_path(image_id, label_filename)
+        label_path.parent.mkdir(exist_ok=True)
+        label_path.write_text("".join(f"{bbox.to_yolo()}\n" for bbox in bbox_list))
         
         # Create labeled image object
         labeled_image = LabeledImage(
@@ -259,14 +497,21 @@ class DatasetManager:
             width=width,
             height=height,
             boxes=bbox_list,
+            label_filename=label_filename,
         )
         
+        # Re-saving the same image replaces its previous entry
+        previous = self.metadata["images"].get(image_id)
+        if previous is not None:
+            self._stats_remove_image(previous)
+        
         # Update metadata
-        self.metadata["images"][image_id] = labeled_image.to_dict()
-        self._save_metadata()
+        self._record({"op": "save", "image": labeled_image.to_dict()})
         
         # Update stats
-        self.stats = self._calculate_stats()
+        self.stats.total_images += 1
+        for bbox in bbox_list:
+            self._stats_add_box(bbox.class_name)
         
         return labeled_image
     
@@ -296,24 +541,18 @@ class DatasetManager:
             height=box["height"],
         )
         
-        image_data["boxes"].append({
-            "class_id": bbox.class_id,
-            "class_name": bbox.class_name,
-            "x_center": bbox.x_center,
-            "y_center": bbox.y_center,
-            "width": bbox.width,
-            "height": bbox.height,
+        self._record({
+            "op": "label",
+            "image_id": image_id,
+            "box": bbox.to_dict(),
         })
         
         # Update label file
-        filename = image_data["filename"]
-        label_filename = filename.replace(".jpg", ".txt")
-        label_path = self.labels_path / label_filename
+        label_path = self._label_path(image_id, image_data["label_filename"])
         with open(label_path, "a") as f:
             f.write(bbox.to_yolo() + "\n")
         
-        self._save_metadata()
-        self.stats = self._calculate_stats()
+        self._stats_add_box(bbox.class_name)
         
         return True
     
@@ -331,8 +570,8 @@ class DatasetManager:
     
     def get_images_list(self, limit: int = 100, offset: int = 0) -> list[dict]:
         """Get list of images with pagination."""
-        images = list(self.metadata["images"].values())
-        return images[offset:offset + limit]
+        offset = max(offset, 0)
+        return list(islice(self.metadata["images"].values(), offset, offset + max(limit, 0)))
     
     def delete_image(self, image_id: str) -> bool:
         """Delete an image from the dataset."""
@@ -343,8 +582,8 @@ class DatasetManager:
         filename = image_data["filename"]
         
         # Delete files
-        image_path = self.images_path / filename
-        label_path = self.labels_path / filename.replace(".jpg", ".txt")
+        image_path = self._image_path(image_id, filename)
+        label_path = self._label_path(image_id, image_data["label_filename"])
         
         if image_path.exists():
             image_path.unlink()
@@ -352,25 +591,29 @@ class DatasetManager:
             label_path.unlink()
         
         # Remove from metadata
-        del self.metadata["images"][image_id]
-        self._save_metadata()
-        self.stats = self._calculate_stats()
+        self._record({"op": "delete", "image_id": image_id})
+        self._stats_remove_image(image_data)
         
         return True
     
-    def export_yolo_dataset(self, output_path: str, train_ratio: float = 0.8) -> dict:
+    def export_yolo_dataset(
+        self,
+        output_path: str,
+        train_ratio: float = 0.8,
+        stratify: bool = True,
+    ) -> dict:
         """
         Export dataset in YOLO format for training.
         
         Args:
             output_path: Path to export to
             train_ratio: Ratio of images for training (rest for validation)
+            stratify: Split each image's dominant card separately, so rare
+                cards appear in both train and val
         
         Returns:
             Export statistics
         """
-        import random
-        
         output = Path(output_path)
         
         # Create directories
@@ -381,18 +624,16 @@ class DatasetManager:
         
         # Get all images
         images = list(self.metadata["images"].values())
-        random.shuffle(images)
-        
-        split_idx = int(len(images) * train_ratio)
-        train_images = images[:split_idx]
-        val_images = images[split_idx:]
+        train_images, val_images = self._split_images(images, train_ratio, stratify)
         
-        # Copy files
-        for img_data in train_images:
-            self._copy_image_files(img_data, output, "train")
-        
-        for img_data in val_images:
-            self._copy_image_files(img_data, output, "val")
+        # Copy files; file I/O releases the GIL, so threads overlap syscalls
+        jobs = [(img_data, "train") for img_data in train_images]
+        jobs += [(img_data, "val") for img_data in val_images]
+        with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as executor:
+            # Consume results to surface copy errors
+            list(executor.map(
+                lambda job: self._copy_image_files(job[0], output, job[1]), jobs
+            ))
         
         # Create dataset.yaml
         yaml_content = f"""# Card Detection Dataset
@@ -417,36 +658,77 @@ names: {CARD_CLASSES}
             "output_path": str(output),
         }
     
+    def _split_images(
+        self,
+        images: list[dict],
+        train_ratio: float,
+        stratify: bool,
+    ) -> tuple[list[dict], list[dict]]:
+        """Randomly split images into (train, val)."""
+        import random
+        
+        if not stratify:
+            images = images.copy()
+            random.shuffle(images)
+            split_idx = int(len(images) * train_ratio)
+            return images[:split_idx], images[split_idx:]
+        
+        # Bucket images by their most frequent card (-1 for unlabeled)
+        buckets: dict[int, list[dict]] = defaultdict(list)
+        for img_data in images:
+            class_ids = Counter(box["class_id"] for box in img_data.get("boxes", []))
+            key = class_ids.most_common(1)[0][0] if class_ids else -1
+            buckets[key].append(img_data)
+        
+        train_images, val_images = [], []
+        for bucket in buckets.values():
+            random.shuffle(bucket)
+            split_idx = int(len(bucket) * train_ratio)
+            # Train on every card; leave one image for val when there are 2+
+            if 0 < train_ratio < 1:
+                split_idx = max(1, min(split_idx, len(bucket) - 1))
+            train_images.extend(bucket[:split_idx])
+            val_images.extend(bucket[split_idx:])
+        
+        return train_images, val_images
+    
     def _copy_image_files(self, img_data: dict, output: Path, split: str):
         """Copy image and label files to export directory."""
         filename = img_data["filename"]
+        label_filename = img_data["label_filename"]
         
-        src_image = self.images_path / filename
-        src_label = self.labels_path / filename.replace(".jpg", ".txt")
+        src_image = self._image_path(img_data["image_id"], filename)
+        src_label = self._label_path(img_data["image_id"], label_filename)
         
         dst_image = output / "images" / split / filename
-        dst_label = output / "labels" / split / filename.replace(".jpg", ".txt")
+        dst_label = output / "labels" / split / label_filename
         
+        # Stored images are never modified, so the export can share them;
+        # labels are appended to by add_label and are copied
         if src_image.exists():
-            shutil.copy2(src_image, dst_image)
+            _link_or_copy(src_image, dst_image)
         if src_label.exists():
             shutil.copy2(src_label, dst_label)
     
     def clear_dataset(self) -> bool:
         """Clear all data from the dataset."""
-        # Remove all images and labels
-        for f in self.images_path.glob("*"):
-            f.unlink()
-        for f in self.labels_path.glob("*"):
-            f.unlink()
+        # Remove all images and labels with their shard directories
+        for path in (self.images_path, self.labels_path):
+            try:
+                shutil.rmtree(path)
+            except FileNotFoundError:
+                pass  # Removed externally, just recreate it
+            path.mkdir(parents=True, exist_ok=True)
         
         # Reset metadata
-        self.metadata = {
-            "images": {},
-            "created_at": datetime.now().isoformat(),
-            "version": "1.0",
-        }
-        self._save_metadata()
+        with self._lock:
+            self.metadata = {
+                "images": {},
+                "created_at": datetime.now().isoformat(),
+                "version": "1.0",
+            }
+            self._dirty = True
+            self._flush_metadata()
         self.stats = self._calculate_stats()
         
         return True
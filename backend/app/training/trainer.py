@@ -18,6 +18,36 @@ from typing import Optional, Callable
 from enum import Enum
 import json
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _stat_or_none(path: Path) -> Optional[os.stat_result]:
+    """Stat a file, or None if it doesn't exist (one syscall instead of exists + stat)."""
+    try:
+        return path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _load_json(raw: bytes):
+    """Parse JSON, accepting the Infinity/NaN literals stdlib json writes."""
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+def _dump_line(entry: dict) -> bytes:
+    """Serialize a history entry as one JSON line."""
+    data = orjson.dumps(entry) if HAS_ORJSON else json.dumps(entry).encode()
+    return data + b"\n"
+
 
 class TrainingStatus(Enum):
     IDLE = "idle"
@@ -102,28 +132,63 @@ class ModelTrainer:
         self.progress = TrainingProgress()
         self.config = TrainingConfig()
         self._training_thread: Optional[threading.Thread] = None
-        self._cancel_flag = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cancel_event = threading.Event()
         
         # Callbacks
         self._on_progress: Optional[Callable] = None
         self._on_complete: Optional[Callable] = None
         
-        # Training history
-        self.history_path = self.models_dir / "training_history.json"
+        # Training history (append-only, one entry per line)
+        self.history_path = self.models_dir / "training_history.jsonl"
         self.history = self._load_history()
+        
+        # get_available_models result and the mtimes it was built at
+        self._models_cache: Optional[list[dict]] = None
+        self._models_cache_stamp: tuple = ()
     
     def _load_history(self) -> list:
-        """Load training history."""
-        if self.history_path.exists():
-            with open(self.history_path, "r") as f:
-                return json.load(f)
-        return []
+        """Load training history, migrating the old single-document file."""
+        legacy_path = self.models_dir / "training_history.json"
+        if legacy_path.exists() and not self.history_path.exists():
+            history = _load_json(legacy_path.read_bytes())
+            with open(self.history_path, "wb") as f:
+                for entry in history:
+                    f.write(_dump_line(entry))
+            legacy_path.unlink()
+            return history
+        
+        if not self.history_path.exists():
+            return []
+        
+        history = []
+        offset = 0
+        line = b"\n"
+        with open(self.history_path, "r+b") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        history.append(_load_json(line))
+                    except ValueError:  # Bad JSON or UTF-8
+                        if line.endswith(b"\n"):
+                            print(f"Warning: Skipping unreadable entry in {self.history_path}")
+                        else:
+                            # Torn final write; drop it so later appends
+                            # start on a fresh line
+                            print(f"Warning: Dropping torn entry at end of {self.history_path}")
+                            f.truncate(offset)
+                            break
+                offset += len(line)
+            else:
+                if not line.endswith(b"\n"):
+                    f.write(b"\n")
+        return history
     
     def _save_history(self, entry: dict):
         """Save training history entry."""
+        with open(self.history_path, "ab") as f:
+            f.write(_dump_line(entry))
         self.history.append(entry)
-        with open(self.history_path, "w") as f:
-            json.dump(self.history, f, indent=2)
     
     def set_config(self, **kwargs):
         """Update training configuration."""
@@ -152,6 +217,10 @@ class ModelTrainer:
         """
         Start training in a background thread.
         
+        Called from an event loop, callbacks are delivered on the loop
+        thread. The worker is a daemon thread so shutting down the server
+        doesn't wait for a run to finish.
+        
         Args:
             dataset_yaml: Path to dataset.yaml file
             on_progress: Callback for progress updates
@@ -165,7 +234,7 @@ class ModelTrainer:
         
         self._on_progress = on_progress
         self._on_complete = on_complete
-        self._cancel_flag = False
+        self._cancel_event.clear()
         
         # Reset progress
         self.progress = TrainingProgress(
@@ -174,6 +243,11 @@ class ModelTrainer:
             started_at=datetime.now(),
         )
         
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        
         # Start training thread
         self._training_thread = threading.Thread(
             target=self._training_worker,
@@ -189,10 +263,20 @@ class ModelTrainer:
         if not self.is_training():
             return False
         
-        self._cancel_flag = True
+        self._cancel_event.set()
         self.progress.status = TrainingStatus.CANCELLED
         return True
     
+    def _notify(self, callback: Callable, payload: dict):
+        """Deliver a callback on the event loop that started training, if any."""
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(callback, payload)
+            except RuntimeError:
+                pass  # Loop closed, server shut down mid-run
+        else:
+            callback(payload)
+    
     def _training_worker(self, dataset_yaml: str):
         """Background training worker."""
         try:
@@ -210,8 +294,10 @@ class ModelTrainer:
             
             # Custom callback for progress
             def on_train_epoch_end(trainer):
-                if self._cancel_flag:
-                    raise KeyboardInterrupt("Training cancelled")
+                # Let ultralytics wind down after this epoch
+                if self._cancel_event.is_set():
+                    trainer.stop = True
+                    return
                 
                 self.progress.current_epoch = trainer.epoch + 1
                 self.progress.current_loss = float(trainer.loss)
@@ -227,7 +313,7 @@ class ModelTrainer:
                     }
                 
                 if self._on_progress:
-                    self._on_progress(self.progress.to_dict())
+                    self._notify(self._on_progress, self.progress.to_dict())
             
             # Add callback
             model.add_callback("on_train_epoch_end", on_train_epoch_end)
@@ -249,6 +335,11 @@ class ModelTrainer:
                 verbose=False,
             )
             
+            if self._cancel_event.is_set():
+                self.progress.status = TrainingStatus.CANCELLED
+                self.progress.completed_at = datetime.now()
+                return
+            
             # Training completed
             self.progress.status = TrainingStatus.COMPLETED
             self.progress.completed_at = datetime.now()
@@ -274,7 +365,7 @@ class ModelTrainer:
             })
             
             if self._on_complete:
-                self._on_complete(self.progress.to_dict())
+                self._notify(self._on_complete, self.progress.to_dict())
         
         except KeyboardInterrupt:
             self.progress.status = TrainingStatus.CANCELLED
@@ -286,32 +377,60 @@ class ModelTrainer:
             self.progress.completed_at = datetime.now()
             
             if self._on_complete:
-                self._on_complete(self.progress.to_dict())
+                self._notify(self._on_complete, self.progress.to_dict())
+        
+        finally:
+            # New run weights are written below the models directory
+            self._models_cache = None
     
     def get_available_models(self) -> list[dict]:
-        """Get list of trained models."""
+        """
+        Get list of trained models.
+        
+        The listing is cached against the mtimes of the models directory
+        and the active model, and rebuilt after every training run.
+        """
+        if self.is_training():
+            return self._scan_models()
+        
+        main_stat = _stat_or_none(self.models_dir / "cards_yolo.pt")
+        stamp = (
+            self.models_dir.stat().st_mtime_ns,
+            main_stat.st_mtime_ns if main_stat is not None else None,
+        )
+        if self._models_cache is None or stamp != self._models_cache_stamp:
+            self._models_cache = self._scan_models()
+            self._models_cache_stamp = stamp
+        return self._models_cache
+    
+    def _scan_models(self) -> list[dict]:
+        """List the active model and the best weights of every training run."""
         models = []
         
         # Check for main model
         main_model = self.models_dir / "cards_yolo.pt"
-        if main_model.exists():
+        main_stat = _stat_or_none(main_model)
+        if main_stat is not None:
             models.append({
                 "name": "cards_yolo.pt",
                 "path": str(main_model),
                 "is_active": True,
-                "modified": datetime.fromtimestamp(main_model.stat().st_mtime).isoformat(),
+                "modified": datetime.fromtimestamp(main_stat.st_mtime).isoformat(),
             })
         
-        # Check training runs
-        for run_dir in self.models_dir.iterdir():
-            if run_dir.is_dir() and run_dir.name.startswith("cards_"):
-                best_model = run_dir / "weights" / "best.pt"
-                if best_model.exists():
+        # Check training runs; scandir entries answer is_dir() without a stat
+        with os.scandir(self.models_dir) as entries:
+            for entry in entries:
+                if not entry.name.startswith("cards_") or not entry.is_dir():
+                    continue
+                best_model = self.models_dir / entry.name / "weights" / "best.pt"
+                best_stat = _stat_or_none(best_model)
+                if best_stat is not None:
                     models.append({
-                        "name": run_dir.name,
+                        "name": entry.name,
                         "path": str(best_model),
                         "is_active": False,
-                        "modified": datetime.fromtimestamp(best_model.stat().st_mtime).isoformat(),
+                        "modified": datetime.fromtimestamp(best_stat.st_mtime).isoformat(),
                     })
         
         return models
@@ -18,8 +18,11 @@ Usage:
 import os
 import sys
 import time
+import re
+import queue
 import hashlib
 import argparse
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Tuple
@@ -35,6 +38,20 @@ except ImportError as e:
     print("Install with: pip install pyautogui opencv-python pillow")
     sys.exit(1)
 
+# Optional faster screen capture
+try:
+    import mss
+    HAS_MSS = True
+except ImportError:
+    HAS_MSS = False
+
+# Optional SIMD JPEG encoder (needs the libjpeg-turbo shared library)
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    HAS_TURBOJPEG = True
+except ImportError:
+    HAS_TURBOJPEG = False
+
 # Try to import Windows-specific modules
 try:
     import pygetwindow as gw
@@ -44,15 +61,32 @@ except ImportError:
     print("Warning: pygetwindow not available, using full screen capture")
 
 
+# Size of one image hash record (16x16 aHash bits) in the hash log
+_HASH_BYTES = 32
+
+
 class ScreenshotCollector:
     """Collects screenshots from PokerOK window."""
     
     # Keywords to identify PokerOK windows
     WINDOW_KEYWORDS = ["pokerok", "poker", "holdem", "nlh", "table"]
+    WINDOW_PATTERN = re.compile("|".join(map(re.escape, WINDOW_KEYWORDS)))
+    
+    # Green felt in BGR: G within [MIN, MAX] and above both R and B by MARGIN
+    # (tuned to agree with the former HSV range [35-85, 50-255, 50-200])
+    TABLE_GREEN_MIN = 50
+    TABLE_GREEN_MAX = 200
+    TABLE_GREEN_MARGIN = 12
+    
+    # Central part of the window holding the felt, as (left, top, right,
+    # bottom) ratios; lobby chrome and borders outside it are ignored
+    FELT_ROI = (0.2, 0.25, 0.8, 0.75)
+    
+    # The green ratio is checked on a thumbnail of this size (width, height)
+    VALIDATION_SIZE = (320, 240)
     
-    # Color ranges for detecting poker table (green felt)
-    TABLE_GREEN_LOW = np.array([35, 50, 50])
-    TABLE_GREEN_HIGH = np.array([85, 255, 200])
+    # Pending screenshot writes before capture blocks
+    WRITE_QUEUE_SIZE = 16
     
     def __init__(
         self,
@@ -60,6 +94,7 @@ class ScreenshotCollector:
         interval: float = 2.0,
         quality: int = 95,
         min_table_ratio: float = 0.15,
+        hash_threshold: int = 8,
     ):
         """
         Initialize the collector.
@@ -69,17 +104,53 @@ class ScreenshotCollector:
             interval: Capture interval in seconds
             quality: JPEG quality (0-100)
             min_table_ratio: Minimum ratio of green pixels to consider valid table
+            hash_threshold: Max differing hash bits (of 256) for a near-duplicate
         """
         self.output_dir = Path(output_dir)
         self.interval = interval
         self.quality = quality
         self.min_table_ratio = min_table_ratio
+        self.hash_threshold = hash_threshold
+        if not 0 <= hash_threshold < 256:
+            raise ValueError(f"hash_threshold must be in [0, 256), got {hash_threshold}")
+        
+        # Screenshots are named by session start time plus a counter
+        self._session_tag = time.strftime("%Y%m%d_%H%M%S")
+        self._counter = 0
+        
+        # Last matched poker window, re-validated before each capture
+        self._cached_window = None
+        
+        # Long-lived grabber; creating one per capture re-acquires DC handles
+        self._sct = mss.mss() if HAS_MSS else None
+        
+        # libjpeg-turbo encoder; falls back to OpenCV if the library is missing
+        self._tj = None
+        if HAS_TURBOJPEG:
+            try:
+                self._tj = TurboJPEG()
+            except (OSError, RuntimeError):
+                pass
+        
+        # JPEG encoding and writing run on a background thread
+        self._io_queue: queue.Queue = queue.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        self._io_thread = threading.Thread(target=self._io_worker, daemon=True)
+        self._io_thread.start()
+        
+        # Per-frame buffers for table validation and hashing
+        self._small_buf: Optional[np.ndarray] = None
+        self._green_buf: Optional[np.ndarray] = None
+        self._channel_buf: Optional[np.ndarray] = None
+        self._diff_buf: Optional[np.ndarray] = None
+        self._mask_buf: Optional[np.ndarray] = None
+        self._hash_buf = np.empty((16, 16, 3), dtype=np.uint8)
+        self._hash_gray_buf = np.empty((16, 16), dtype=np.uint8)
         
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Track captured images to avoid duplicates
-        self.captured_hashes = set()
+        # Track captured images to avoid duplicates (aHash bits as ints)
+        self.captured_hashes: set[int] = set()
         self.stats = {
             "total_captured": 0,
             "duplicates_skipped": 0,
@@ -89,24 +160,88 @@ class ScreenshotCollector:
         
         # Load existing hashes
         self._load_existing_hashes()
+        
+        # Index hashes by bit block: a hash within hash_threshold bits of
+        # another matches it exactly on at least one of hash_threshold + 1
+        # blocks, so near-duplicate checks only compare against those.
+        # Blocks are (shift, mask) pairs of near-equal width (ceil or floor
+        # of 256 / blocks), so no bucket is much coarser than the others.
+        n_blocks = self.hash_threshold + 1
+        bounds = [-(-256 * i // n_blocks) for i in range(n_blocks + 1)]
+        self._hash_block_spec = [
+            (lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])
+        ]
+        self._hash_index: list[dict[int, list[int]]] = [{} for _ in range(n_blocks)]
+        for img_hash in self.captured_hashes:
+            self._index_hash(img_hash)
     
     def _load_existing_hashes(self):
-        """Load hashes of existing images to avoid duplicates."""
-        hash_file = self.output_dir / ".image_hashes.json"
-        if hash_file.exists():
+        """
+        Load hashes of existing images to avoid duplicates.
+        
+        Hashes live in an append-only binary log of fixed-size little-endian
+        records; hex hash files from older versions are folded into it.
+        """
+        self._hash_log_path = self.output_dir / ".hashes.bin"
+        legacy_log = self.output_dir / ".hashes.log"
+        legacy_file = self.output_dir / ".image_hashes.json"
+        
+        log_records = 0
+        torn_tail = False
+        log_loaded = True
+        try:
+            if self._hash_log_path.exists():
+                data = self._hash_log_path.read_bytes()
+                log_records, tail = divmod(len(data), _HASH_BYTES)
+                torn_tail = tail > 0  # Interrupted append
+                self.captured_hashes.update(
+                    int.from_bytes(data[i:i + _HASH_BYTES], "little")
+                    for i in range(0, log_records * _HASH_BYTES, _HASH_BYTES)
+                )
+        except OSError as e:
+            log_loaded = False
+            print(f"Warning: Could not load hash file: {e}")
+        
+        # Legacy files are only removed once their hashes made it into the set
+        migrated = []
+        for legacy_path, parse in (
+            (legacy_log, lambda f: [int(line, 16) for line in f if line.strip()]),
+            (legacy_file, lambda f: [int(h, 16) for h in json.load(f)]),
+        ):
+            if not legacy_path.exists():
+                continue
             try:
-                with open(hash_file, "r") as f:
-                    self.captured_hashes = set(json.load(f))
-                print(f"Loaded {len(self.captured_hashes)} existing image hashes")
-            except Exception as e:
-                print(f"Warning: Could not load hash file: {e}")
+                with open(legacy_path, "r") as f:
+                    self.captured_hashes.update(parse(f))
+                migrated.append(legacy_path)
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Warning: Could not load {legacy_path.name}, leaving it in place: {e}")
+        
+        if self.captured_hashes:
+            print(f"Loaded {len(self.captured_hashes)} existing image hashes")
+        
+        # Compact when the log has grown well past the set it encodes; never
+        # overwrite a log that could not be read
+        if log_loaded and (
+            migrated or torn_tail or log_records > 2 * len(self.captured_hashes)
+        ):
+            self._compact_hash_log()
+            for legacy_path in migrated:
+                legacy_path.unlink(missing_ok=True)
+        
+        self._hash_log = open(self._hash_log_path, "ab")
+    
+    def _compact_hash_log(self):
+        """Rewrite the hash log with one record per known hash."""
+        tmp_path = self._hash_log_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(h.to_bytes(_HASH_BYTES, "little") for h in self.captured_hashes))
+        tmp_path.replace(self._hash_log_path)
     
     def _save_hashes(self):
-        """Save image hashes to file."""
-        hash_file = self.output_dir / ".image_hashes.json"
+        """Flush appended image hashes to disk."""
         try:
-            with open(hash_file, "w") as f:
-                json.dump(list(self.captured_hashes), f)
+            self._hash_log.flush()
         except Exception as e:
             print(f"Warning: Could not save hash file: {e}")
     
@@ -120,18 +255,35 @@ class ScreenshotCollector:
         if not HAS_PYGETWINDOW:
             return None
         
+        # The table window rarely changes, skip enumerating all windows
+        if self._cached_window is not None:
+            try:
+                region = self._window_region(self._cached_window)
+                if region is not None:
+                    return region
+            except Exception:
+                pass  # Window was closed
+            self._cached_window = None
+        
         try:
             windows = gw.getAllWindows()
             for window in windows:
-                title = window.title.lower()
-                if any(keyword in title for keyword in self.WINDOW_KEYWORDS):
-                    if window.width > 400 and window.height > 300:  # Minimum size
-                        return (window.left, window.top, window.width, window.height)
+                region = self._window_region(window)
+                if region is not None:
+                    self._cached_window = window
+                    return region
         except Exception as e:
             print(f"Error finding window: {e}")
         
         return None
     
+    def _window_region(self, window) -> Optional[Tuple[int, int, int, int]]:
+        """Return (left, top, width, height) if the window looks like a poker table."""
+        if self.WINDOW_PATTERN.search(window.title.lower()):
+            if window.width > 400 and window.height > 300:  # Minimum size
+                return (window.left, window.top, window.width, window.height)
+        return None
+    
     def capture_screen(self, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
         """
         Capture screenshot of specified region or full screen.
@@ -142,6 +294,18 @@ class ScreenshotCollector:
         Returns:
             Screenshot as numpy array (BGR)
         """
+        if self._sct is not None:
+            if region:
+                left, top, width, height = region
+                monitor = {"left": left, "top": top, "width": width, "height": height}
+            else:
+                monitor = self._sct.monitors[1]  # Primary screen, like pyautogui
+            raw = self._sct.grab(monitor)
+            
+            # Raw BGRA pixels, dropping alpha is the only conversion needed
+            bgra = np.frombuffer(raw.bgra, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+        
         if region:
             screenshot = pyautogui.screenshot(region=region)
         else:
@@ -157,67 +321,148 @@ class ScreenshotCollector:
         
         Uses color analysis to detect the green felt.
         """
-        # Convert to HSV
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        
-        # Create mask for green table
-        mask = cv2.inRange(hsv, self.TABLE_GREEN_LOW, self.TABLE_GREEN_HIGH)
+        # Only look where the felt is; slicing is a view, not a copy
+        height, width = image.shape[:2]
+        left, top, right, bottom = self.FELT_ROI
+        image = image[int(top * height):int(bottom * height), int(left * width):int(right * width)]
+        
+        # Only a pixel ratio is needed, so check a point-sampled thumbnail
+        # (INTER_AREA would cost more than converting the full frame)
+        height, width = image.shape[:2]
+        if width * height > self.VALIDATION_SIZE[0] * self.VALIDATION_SIZE[1]:
+            self._small_buf = cv2.resize(
+                image, self.VALIDATION_SIZE, dst=self._small_buf, interpolation=cv2.INTER_NEAREST
+            )
+            image = self._small_buf
+        
+        # Threshold the green channel first; buffers are reused across frames.
+        # Felt pixels are a subset of these, so bright/dark screens exit early.
+        self._green_buf = cv2.extractChannel(image, 1, dst=self._green_buf)
+        self._mask_buf = cv2.inRange(
+            self._green_buf, self.TABLE_GREEN_MIN, self.TABLE_GREEN_MAX, dst=self._mask_buf
+        )
+        if cv2.countNonZero(self._mask_buf) < self.min_table_ratio * self._mask_buf.size:
+            return False
+        
+        # Keep pixels where G exceeds B and R by the margin (saturating uint8
+        # math, no color space conversion)
+        for channel in (0, 2):
+            self._channel_buf = cv2.extractChannel(image, channel, dst=self._channel_buf)
+            self._diff_buf = cv2.subtract(self._green_buf, self._channel_buf, dst=self._diff_buf)
+            self._diff_buf = cv2.compare(
+                self._diff_buf, self.TABLE_GREEN_MARGIN, cv2.CMP_GT, dst=self._diff_buf
+            )
+            self._mask_buf = cv2.bitwise_and(self._mask_buf, self._diff_buf, dst=self._mask_buf)
         
         # Calculate ratio of green pixels
-        green_ratio = np.sum(mask > 0) / mask.size
+        green_ratio = cv2.countNonZero(self._mask_buf) / self._mask_buf.size
         
         return green_ratio >= self.min_table_ratio
     
-    def compute_image_hash(self, image: np.ndarray) -> str:
+    def compute_image_hash(self, image: np.ndarray) -> int:
         """
         Compute perceptual hash of image for duplicate detection.
         
-        Uses a simplified average hash (aHash) approach.
+        Uses a simplified average hash (aHash) approach; bit i of the
+        returned 256-bit int is set when pixel i is above average.
         """
-        # Resize to small size
-        small = cv2.resize(image, (16, 16))
-        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        # Resize to small size, into buffers reused across frames
+        small = cv2.resize(image, (16, 16), dst=self._hash_buf)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._hash_gray_buf)
         
         # Compute average
         avg = gray.mean()
         
         # Create binary hash
-        binary = (gray > avg).flatten()
+        binary = (gray > avg).ravel()
         
-        # Convert to hex string
-        hash_int = sum(1 << i for i, b in enumerate(binary) if b)
-        return hex(hash_int)[2:].zfill(64)
+        # Pack into an int
+        return int.from_bytes(np.packbits(binary, bitorder="little").tobytes(), "little")
     
     def is_duplicate(self, image: np.ndarray) -> bool:
-        """Check if image is a duplicate of previously captured."""
+        """Check if image is a (near-)duplicate of previously captured."""
         img_hash = self.compute_image_hash(image)
         
         if img_hash in self.captured_hashes:
             return True
         
+        # Near-duplicates from screen jitter differ in a few hash bits
+        if self.hash_threshold > 0 and any(
+            (img_hash ^ seen).bit_count() <= self.hash_threshold
+            for block, index in zip(self._hash_blocks(img_hash), self._hash_index)
+            for seen in index.get(block, ())
+        ):
+            return True
+        
         self.captured_hashes.add(img_hash)
+        self._index_hash(img_hash)
+        self._hash_log.write(img_hash.to_bytes(_HASH_BYTES, "little"))
+        self._hash_log.flush()
         return False
     
+    def _hash_blocks(self, img_hash: int) -> list[int]:
+        """Split a 256-bit hash into the blocks used by the near-duplicate index."""
+        return [
+            (img_hash >> shift) & mask for shift, mask in self._hash_block_spec
+        ]
+    
+    def _index_hash(self, img_hash: int):
+        """Add a hash to the near-duplicate index."""
+        for block, index in zip(self._hash_blocks(img_hash), self._hash_index):
+            index.setdefault(block, []).append(img_hash)
+    
     def save_screenshot(self, image: np.ndarray) -> str:
         """
-        Save screenshot to output directory.
+        Queue screenshot to be saved to output directory.
+        
+        The image must not be modified afterwards; call flush_writes()
+        to wait until queued files are on disk.
         
         Returns:
             Path to saved file
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        filename = f"screenshot_{timestamp}.jpg"
+        self._counter += 1
+        filename = f"screenshot_{self._session_tag}_{self._counter:06d}.jpg"
         filepath = self.output_dir / filename
         
-        # Save with quality setting
-        cv2.imwrite(
-            str(filepath),
-            image,
-            [cv2.IMWRITE_JPEG_QUALITY, self.quality]
-        )
+        self.queue_write(filepath, image)
         
         return str(filepath)
     
+    def queue_write(self, filepath: Path, image: np.ndarray):
+        """Queue an image to be JPEG-encoded and written by the writer thread."""
+        self._io_queue.put((filepath, image))
+    
+    def _io_worker(self):
+        """Encode and write queued screenshots."""
+        while True:
+            filepath, image = self._io_queue.get()
+            try:
+                # Save with quality setting
+                if self._tj is not None:
+                    encoded = self._tj.encode(
+                        image, quality=self.quality,
+                        pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420,
+                    )
+                else:
+                    ok, buf = cv2.imencode(
+                        ".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+                    )
+                    if not ok:
+                        print(f"Warning: Could not encode {filepath.name}")
+                        continue
+                    encoded = buf.tobytes()
+                
+                filepath.write_bytes(encoded)
+            except Exception as e:
+                print(f"Warning: Could not save {filepath.name}: {e}")
+            finally:
+                self._io_queue.task_done()
+    
+    def flush_writes(self):
+        """Wait for queued screenshots to be written."""
+        self._io_queue.join()
+    
     def capture_once(self) -> Optional[str]:
         """
         Capture a single screenshot if valid.
@@ -291,6 +536,7 @@ class ScreenshotCollector:
             print("\n\nStopped by user")
         
         finally:
+            self.flush_writes()
             self._save_hashes()
             self._print_stats()
     
@@ -311,9 +557,19 @@ class ScreenshotCollector:
 class CardRegionExtractor:
     """Extracts card regions from full table screenshots."""
     
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, collector: Optional[ScreenshotCollector] = None):
+        """
+        Args:
+            output_dir: Directory to save card crops
+            collector: Collector whose background writer saves the crops
+                (written synchronously if None)
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.collector = collector
+        
+        # Pixel rectangles per (width, height), tables rarely get resized
+        self._pixel_regions: dict[Tuple[int, int], list] = {}
         
         # Approximate card regions (will be refined based on actual screenshots)
         # Format: (x_ratio, y_ratio, width_ratio, height_ratio)
@@ -338,12 +594,7 @@ class CardRegionExtractor:
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        for region_name, (x_r, y_r, w_r, h_r) in self.card_regions.items():
-            x = int(x_r * w)
-            y = int(y_r * h)
-            rw = int(w_r * w)
-            rh = int(h_r * h)
-            
+        for region_name, x, y, rw, rh in self._regions_for(w, h):
             # Extract region
             card_img = image[y:y+rh, x:x+rw]
             
@@ -354,10 +605,24 @@ class CardRegionExtractor:
             # Save
             filename = f"{prefix}{timestamp}_{region_name}.jpg"
             filepath = self.output_dir / filename
-            cv2.imwrite(str(filepath), card_img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+            if self.collector is not None:
+                self.collector.queue_write(filepath, card_img)
+            else:
+                cv2.imwrite(str(filepath), card_img, [cv2.IMWRITE_JPEG_QUALITY, 95])
             saved.append(str(filepath))
         
         return saved
+    
+    def _regions_for(self, w: int, h: int) -> list:
+        """Return (name, x, y, width, height) pixel rectangles for a frame size."""
+        regions = self._pixel_regions.get((w, h))
+        if regions is None:
+            regions = [
+                (name, int(x_r * w), int(y_r * h), int(w_r * w), int(h_r * h))
+                for name, (x_r, y_r, w_r, h_r) in self.card_regions.items()
+            ]
+            self._pixel_regions[(w, h)] = regions
+        return regions
 
 
 def main():
@@ -394,6 +659,14 @@ def main():
         default=95,
         help="JPEG quality (0-100)"
     )
+    parser.add_argument(
+        "--hash-threshold",
+        type=int,
+        choices=range(256),
+        metavar="[0-255]",
+        default=8,
+        help="Skip screenshots whose 256-bit hash differs in at most this many bits (0 = exact only)"
+    )
     parser.add_argument(
         "--extract-cards",
         action="store_true",
@@ -407,6 +680,7 @@ def main():
         output_dir=args.output,
         interval=args.interval,
         quality=args.quality,
+        hash_threshold=args.hash_threshold,
     )
     
     # Run
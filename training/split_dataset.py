@@ -9,14 +9,49 @@ import os
 import random
 import shutil
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def _place(src: Path, dst: Path, move: bool = False):
+    """
+    Put src at dst without copying bytes where possible.
+    
+    Hardlinks share the file with the input directory (edits to one show
+    in the other); move relocates it instead. Both fall back to a real
+    copy/move across filesystems.
+    """
+    # Already in place; unlinking dst would delete the source
+    if dst.resolve() == src.resolve():
+        return
+    
+    # rename() is a no-op when dst is already a hardlink of src
+    if dst.exists():
+        dst.unlink()
+    
+    if move:
+        try:
+            os.rename(src, dst)
+        except OSError:
+            shutil.move(src, dst)
+        return
+    
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
 def split_dataset(
     input_dir: str,
     output_dir: str = None,
     train_ratio: float = 0.8,
     seed: int = 42,
+    move: bool = False,
 ):
     """
     Split images into train and validation sets.
@@ -26,6 +61,7 @@ def split_dataset(
         output_dir: Output directory (default: parent of input_dir)
         train_ratio: Ratio of images for training (0-1)
         seed: Random seed for reproducibility
+        move: Move files out of input_dir instead of hardlinking them
     """
     input_path = Path(input_dir)
     
@@ -37,12 +73,23 @@ def split_dataset(
     # Create output directories
     train_dir = output_path / "train"
     val_dir = output_path / "val"
+    
+    # Splitting a directory into itself would leave val images in train
+    if input_path.resolve() in (train_dir.resolve(), val_dir.resolve()):
+        print(f"Input {input_dir} is also an output directory; pass --output elsewhere")
+        return
+    
     train_dir.mkdir(parents=True, exist_ok=True)
     val_dir.mkdir(parents=True, exist_ok=True)
     
-    # Get all images
-    extensions = {".jpg", ".jpeg", ".png", ".bmp"}
-    images = [f for f in input_path.iterdir() if f.suffix.lower() in extensions]
+    # Get all image names; scandir entries know their type without a stat
+    images = []
+    existing = set()
+    with os.scandir(input_path) as entries:
+        for entry in entries:
+            existing.add(entry.name)
+            if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                images.append(entry.name)
     
     if not images:
         print(f"No images found in {input_dir}")
@@ -60,22 +107,25 @@ def split_dataset(
     
     print(f"Train: {len(train_images)}, Val: {len(val_images)}")
     
-    # Copy files
-    for img in train_images:
-        shutil.copy2(img, train_dir / img.name)
-        
-        # Also copy label if exists
-        label_file = img.with_suffix(".txt")
-        if label_file.exists():
-            shutil.copy2(label_file, train_dir.parent.parent / "labels" / "train" / label_file.name)
-    
-    for img in val_images:
-        shutil.copy2(img, val_dir / img.name)
-        
-        # Also copy label if exists
-        label_file = img.with_suffix(".txt")
-        if label_file.exists():
-            shutil.copy2(label_file, val_dir.parent.parent / "labels" / "val" / label_file.name)
+    # Collect (src, dst) pairs for images and their labels up front
+    pairs = []
+    for split_images, image_dir, split in (
+        (train_images, train_dir, "train"),
+        (val_images, val_dir, "val"),
+    ):
+        label_dir = image_dir.parent.parent / "labels" / split
+        for name in split_images:
+            pairs.append((input_path / name, image_dir / name))
+            
+            # Also place label if exists
+            label_name = os.path.splitext(name)[0] + ".txt"
+            if label_name in existing:
+                pairs.append((input_path / label_name, label_dir / label_name))
+    
+    # Link (or move) files into place; overlap the filesystem round-trips
+    sources, destinations = zip(*pairs)
+    with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as executor:
+        list(executor.map(partial(_place, move=move), sources, destinations))
     
     print(f"\nDataset split complete!")
     print(f"  Train: {train_dir}")
@@ -88,6 +138,7 @@ def main():
     parser.add_argument("--output", "-o", default=None, help="Output directory")
     parser.add_argument("--ratio", "-r", type=float, default=0.8, help="Train ratio")
     parser.add_argument("--seed", "-s", type=int, default=42, help="Random seed")
+    parser.add_argument("--move", action="store_true", help="Move files instead of hardlinking them")
     
     args = parser.parse_args()
     
@@ -96,6 +147,7 @@ def main():
         output_dir=args.output,
         train_ratio=args.ratio,
         seed=args.seed,
+        move=args.move,
     )
 
 